@@ -2,25 +2,17 @@ from __future__ import annotations
 from typing import List, TYPE_CHECKING
 import ast
 
+from yoink.compilation.streamop_visitor import DispatchByType
+
 if TYPE_CHECKING:
     from yoink.stream_ops.bufferop import BufferOp, ConstantOp, RegisterBuffer, WaitOpBuffer, BinaryOp, UnaryOp, ComparisonOp
     from yoink.compilation import CompilationContext, StateVar
     
 
-class BufferOpVisitor:
+class BufferOpVisitor(DispatchByType):
     def __init__(self, ctx: 'CompilationContext'):
         self.ctx = ctx
 
-    def visit(self, node: 'BufferOp'):
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node: 'BufferOp'):
-        raise NotImplementedError(
-            f"{self.__class__.__name__} has no visit method for {node.__class__.__name__}"
-        )
-
     def visit_ConstantOp(self, node: ConstantOp):
         raise NotImplementedError
 
@@ -3,37 +3,52 @@
 from __future__ import annotations
 
 import ast
-from typing import Dict, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Local name that generated methods bind the packed state list to.
+STATE_LOCAL = '_state'
 
 
 class StateVar:
-    """Wrapper for a state variable with pre-built AST rvalue/lvalue nodes."""
+    """Wrapper for a state variable with pre-built AST rvalue/lvalue nodes.
+
+    A state var is a local (tmp), a slot in the packed state list (slot), or
+    an attribute on self. The load and store nodes are built once and shared
+    by every reference; generated code never mutates them.
+    """
+
+    __slots__ = ('name', 'tmp', 'slot', '_rvalue', '_lvalue')
 
-    def __init__(self, name: str, tmp: bool = False):
+    def __init__(self, name: str, tmp: bool = False, slot: Optional[int] = None):
         self.name = name
         self.tmp = tmp
+        self.slot = slot
+        self._rvalue = self._build(ast.Load())
+        self._lvalue = self._build(ast.Store())
 
-    def rvalue(self) -> ast.expr:
-        """Get AST node for reading this variable (load context)."""
+    def _build(self, ctx: ast.expr_context) -> ast.expr:
         if self.tmp:
-            return ast.Name(id=self.name, ctx=ast.Load())
+            return ast.Name(id=self.name, ctx=ctx)
+        elif self.slot is not None:
+            return ast.Subscript(
+                value=ast.Name(id=STATE_LOCAL, ctx=ast.Load()),
+                slice=ast.Constant(value=self.slot),
+                ctx=ctx
+            )
         else:
             return ast.Attribute(
                 value=ast.Name(id='self', ctx=ast.Load()),
                 attr=self.name,
-                ctx=ast.Load()
+                ctx=ctx
             )
 
+    def rvalue(self) -> ast.expr:
+        """Get AST node for reading this variable (load context)."""
+        return self._rvalue
+
     def lvalue(self) -> ast.expr:
         """Get AST node for writing to this variable (store context)."""
-        if self.tmp:
-            return ast.Name(id=self.name, ctx=ast.Store())
-        else:
-            return ast.Attribute(
-                value=ast.Name(id='self', ctx=ast.Load()),
-                attr=self.name,
-                ctx=ast.Store()
-            )
+        return self._lvalue
 
     def assign(self, value: ast.expr) -> ast.Assign:
         return ast.Assign(
@@ -49,16 +64,36 @@ class StateVar:
 
 
 class CompilationContext:
-    """Tracks state allocation and compiled child destinations during compilation."""
-
-    def __init__(self):
+    """Tracks state allocation and compiled child destinations during compilation.
+
+    With packed_state, every state var is given a slot in a single list that
+    the generated code binds to the local `_state`, rather than an attribute
+    on self. With local_state, every state var is a local of the generated
+    function.
+    """
+
+    __slots__ = (
+        'packed_state', 'local_state', 'state_slot_count', 'state_vars', 'type_counters', 'var_to_input_idx',
+        'temp_counter', 'compiled_nodes', 'compiled_stmts', 'compiled_dumps', 'escape_exceptions',
+        'recurse_exceptions', 'singleton_events', 'subgenerators', 'used_locals',
+    )
+
+    def __init__(self, packed_state: bool = False, local_state: bool = False):
+        self.packed_state = packed_state
+        self.local_state = local_state
+        self.state_slot_count: int = 0
         self.state_vars: Dict[int, Dict[str, StateVar]] = {}  # node.id -> {var_name: StateVar}
         self.type_counters: Dict[str, int] = {}  # StreamOp class name -> counter
         self.var_to_input_idx: Dict[int, int] = {}  # Var.id -> input array index
         self.temp_counter: int = 0
         self.compiled_nodes: Set[int] = set()  # Track which nodes are compiled
+        self.compiled_stmts: Dict[Tuple[int, str], List[ast.stmt]] = {}  # (id(node), dst name) -> compiled stmts
+        self.compiled_dumps: Dict[Tuple[int, str], str] = {}  # (id(node), dst name) -> ast.dump of compiled stmts
         self.escape_exceptions: Dict[int, str] = {}  # coordinator.id -> exception class name
         self.recurse_exceptions: Dict[int, str] = {}  # RecursiveSection.id -> exception class name
+        self.singleton_events: Dict[str, Any] = {}  # prebuilt event name -> SingletonOp value
+        self.subgenerators: List[ast.FunctionDef] = []  # outlined branch generators defined at the top of __iter__
+        self.used_locals: Set[str] = set()  # globals referenced through their __iter__-local alias
 
     def state_var(self, node, var_name: str) -> StateVar:
         if node.id in self.state_vars and var_name in self.state_vars[node.id]:
@@ -68,7 +103,13 @@ class CompilationContext:
 
         node_id_hex = f'{node.id & 0xffffffffffffffff:x}'
         full_name = f'{node_type}_{node_id_hex}_{var_name}'
-        state_var = StateVar(full_name)
+        if self.packed_state:
+            state_var = StateVar(full_name, slot=self.state_slot_count)
+            self.state_slot_count += 1
+        elif self.local_state:
+            state_var = StateVar(full_name, tmp=True)
+        else:
+            state_var = StateVar(full_name)
 
         if node.id not in self.state_vars:
             self.state_vars[node.id] = {}
@@ -102,3 +143,24 @@ class CompilationContext:
         exception_name = f'Recurse_{node_type}_{node_id_hex}'
         self.recurse_exceptions[node.id] = exception_name
         return exception_name
+
+    def singleton_event(self, node) -> str:
+        """Get or create the module-level name of the prebuilt event for this SingletonOp."""
+        node_id_hex = f'{node.id & 0xffffffffffffffff:x}'
+        event_name = f'_singleton_{node_id_hex}'
+        self.singleton_events[event_name] = node.value
+        return event_name
+
+    def singleton_event_defs(self) -> List[ast.stmt]:
+        """Module-level assignments that build each prebuilt SingletonOp event once."""
+        return [
+            ast.Assign(
+                targets=[ast.Name(id=name, ctx=ast.Store())],
+                value=ast.Call(
+                    func=ast.Name(id='BaseEvent', ctx=ast.Load()),
+                    args=[ast.Constant(value=value)],
+                    keywords=[]
+                )
+            )
+            for name, value in self.singleton_events.items()
+        ]
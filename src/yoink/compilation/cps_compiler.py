@@ -13,12 +13,13 @@ import ast
 from yoink.compilation.bufferop_state_compiler import BufferOpStateCompiler
 from yoink.compilation.event_buffer_size import EventBufferSize
 from yoink.compilation.runtime import Runtime
-from yoink.compilation.streamop_visitor import StreamOpVisitor
+from yoink.compilation.streamop_visitor import StreamOpVisitor, bad_tag, has_kind, has_tag_kind
 from yoink.compilation import CompilationContext, StateVar
 from yoink.compilation.streamop_reset_compiler import StreamOpResetCompiler
 from yoink.stream_ops.emitop import EmitOp
 from yoink.stream_ops.register_update_op import RegisterUpdateOp
 from yoink.stream_ops.waitop import WaitOp
+from yoink.event import KIND_CATEVA, KIND_CATPUNC, KIND_PLUSPUNCA, KIND_PLUSPUNCB
 
 if TYPE_CHECKING:
     from yoink.stream_ops.var import Var
@@ -37,6 +38,8 @@ if TYPE_CHECKING:
 
 class CPSCompiler(StreamOpVisitor):
 
+    __slots__ = ('done_cont', 'skip_cont', 'yield_cont')
+
     def __init__(self, ctx, done_cont: List[ast.stmt], skip_cont: List[ast.stmt],
                  yield_cont: Callable[[ast.expr], List[ast.stmt]]):
         super().__init__(ctx)
@@ -56,8 +59,9 @@ class CPSCompiler(StreamOpVisitor):
         """
         module_ast = CPSCompiler._generate_module_ast(dataflow_graph)
 
-        # Compile to bytecode and execute
-        code = compile(module_ast, '<generated>', 'exec')
+        # Compile to bytecode and execute. Generated code has no asserts or docstrings to keep,
+        # so compile at the top optimization level
+        code = compile(module_ast, '<generated>', 'exec', optimize=2)
 
         runtime = Runtime()
         return runtime.exec(code)
@@ -90,15 +94,14 @@ class CPSCompiler(StreamOpVisitor):
         yield_cont = lambda expr: [result_var.assign(expr)]
 
         compiler = CPSCompiler(ctx, done_cont, skip_cont, yield_cont)
-        output_stmts = dataflow_graph.outputs.accept(compiler)
+        output_stmts = compiler.visit(dataflow_graph.outputs)
 
         # Generate the class AST
         class_ast = CPSCompiler._generate_class_ast(dataflow_graph, ctx, output_stmts)
 
-        # Generate module AST
-        module_ast = ast.Module(body=[class_ast], type_ignores=[])
+        # Generate module AST, building each singleton's event once at module level
+        module_ast = ast.Module(body=ctx.singleton_event_defs() + [class_ast], type_ignores=[])
         ast.fix_missing_locations(module_ast)
-
         return module_ast
 
     @staticmethod
@@ -241,7 +244,11 @@ class CPSCompiler(StreamOpVisitor):
         )
 
     def visit_Var(self, node: 'Var') -> List[ast.stmt]:
-        """Compile to: try: tmp = next(self.inputs[idx]); yield_cont(tmp) except StopIteration: done_cont"""
+        """Compile to: try: tmp = next(self.inputs[idx]); yield_cont(tmp) except StopIteration: done_cont
+
+        A None read from an input is a tick without an event and goes to skip_cont, so the
+        continuations only ever see events.
+        """
         input_idx = self.ctx.var_to_input_idx[node.id]
 
         tmp_var = self.ctx.allocate_temp()
@@ -265,8 +272,17 @@ class CPSCompiler(StreamOpVisitor):
         return [
             ast.Try(
                 body=[
-                    tmp_var.assign(next_call)
-                ] + self.yield_cont(tmp_var.rvalue()),
+                    tmp_var.assign(next_call),
+                    ast.If(
+                        test=ast.Compare(
+                            left=tmp_var.rvalue(),
+                            ops=[ast.Is()],
+                            comparators=[ast.Constant(value=None)]
+                        ),
+                        body=self.skip_cont,
+                        orelse=self.yield_cont(tmp_var.rvalue())
+                    )
+                ],
                 handlers=[
                     ast.ExceptHandler(
                         type=ast.Name(id='StopIteration', ctx=ast.Load()),
@@ -287,11 +303,8 @@ class CPSCompiler(StreamOpVisitor):
         """Emit value once, then done."""
         exhausted_var = self.ctx.state_var(node, 'exhausted')
 
-        event_expr = ast.Call(
-            func=ast.Name(id='BaseEvent', ctx=ast.Load()),
-            args=[ast.Constant(value=node.value)],
-            keywords=[]
-        )
+        # The event is built once at module level, not on every firing
+        event_expr = ast.Name(id=self.ctx.singleton_event(node), ctx=ast.Load())
 
         return [
             ast.If(
@@ -311,16 +324,12 @@ class CPSCompiler(StreamOpVisitor):
         """Emit tag, then compile input stream."""
         tag_var = self.ctx.state_var(node, 'tag_emitted')
 
-        tag_class = 'PlusPuncA' if node.position == 0 else 'PlusPuncB'
-
-        tag_event = ast.Call(
-            func=ast.Name(id=tag_class, ctx=ast.Load()),
-            args=[],
-            keywords=[]
+        tag_event = ast.Name(
+            id='PLUS_PUNC_A' if node.position == 0 else 'PLUS_PUNC_B',
+            ctx=ast.Load()
         )
 
-        input_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = self.visit(node.input_stream)
 
         # If tag not emitted, emit it; otherwise delegate to input
         return [
@@ -338,8 +347,7 @@ class CPSCompiler(StreamOpVisitor):
 
     def visit_UnsafeCast(self, node: 'UnsafeCast') -> List[ast.stmt]:
         """Pass through to input stream."""
-        input_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        return node.input_stream.accept(input_compiler)
+        return self.visit(node.input_stream)
 
     def visit_CatR(self, node: 'CatR') -> List[ast.stmt]:
         """Compile CatR state machine with CPS."""
@@ -359,18 +367,13 @@ class CPSCompiler(StreamOpVisitor):
         first_stream_done_cont = [
             state_var.assign(ast.Constant(value=CatRState.SECOND_STREAM.value))
         ] + self.yield_cont(
-            ast.Call(
-                func=ast.Name(id='CatPunc', ctx=ast.Load()),
-                args=[],
-                keywords=[]
-            )
+            ast.Name(id='CAT_PUNC', ctx=ast.Load())
         )
 
         s1_compiler = CPSCompiler(self.ctx, first_stream_done_cont, self.skip_cont, first_stream_yield_cont)
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
-        s2_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         return [
             ast.If(
@@ -385,55 +388,47 @@ class CPSCompiler(StreamOpVisitor):
         ]
 
     def visit_CatProj(self, node: 'CatProj') -> List[ast.stmt]:
-        """Compile CatProj with CPS."""
-        coord = node.coordinator
-        coord_id = coord.id
+        """Compile CatProj with CPS.
+
+        The coordinator's progress is a single CatProjPhase value: BEFORE_PUNC, AFTER_PUNC
+        or EXHAUSTED.
+        """
+        from yoink.stream_ops.catproj import CatProjPhase
 
-        seen_punc_var = self.ctx.state_var(coord, 'seen_punc')
-        input_exhausted_var = self.ctx.state_var(coord, 'input_exhausted')
+        coord = node.coordinator
+        phase_var = self.ctx.state_var(coord, 'phase')
+        input_done_cont = [phase_var.assign(ast.Constant(value=CatProjPhase.EXHAUSTED.value))] + self.done_cont
 
         if node.position == 0:
             def input_yield_cont(event_expr):
                 return [
                     ast.If(
-                        test=ast.Call(
-                            func=ast.Name(id='isinstance', ctx=ast.Load()),
-                            args=[event_expr, ast.Name(id='CatEvA', ctx=ast.Load())],
-                            keywords=[]
-                        ),
+                        test=has_kind(event_expr, KIND_CATEVA),
                         body=self.yield_cont(
                             ast.Attribute(value=event_expr, attr='value', ctx=ast.Load())
                         ),
                         orelse=[
                             ast.If(
-                                test=ast.Call(
-                                    func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                    args=[event_expr, ast.Name(id='CatPunc', ctx=ast.Load())],
-                                    keywords=[]
-                                ),
-                                body=[seen_punc_var.assign(ast.Constant(value=True))] + self.done_cont,
+                                test=has_kind(event_expr, KIND_CATPUNC),
+                                body=[phase_var.assign(ast.Constant(value=CatProjPhase.AFTER_PUNC.value))] + self.done_cont,
                                 orelse=self.skip_cont
                             )
                         ]
                     )
                 ]
 
-            input_done_cont = [input_exhausted_var.assign(ast.Constant(value=True))] + self.done_cont
-
             input_compiler = CPSCompiler(self.ctx, input_done_cont, self.skip_cont, input_yield_cont)
-            input_stmts = coord.input_stream.accept(input_compiler)
+            input_stmts = input_compiler.visit(coord.input_stream)
 
             return [
                 ast.If(
-                    test=input_exhausted_var.rvalue(),
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.NotEq()],
+                        comparators=[ast.Constant(value=CatProjPhase.BEFORE_PUNC.value)]
+                    ),
                     body=self.done_cont,
-                    orelse=[
-                        ast.If(
-                            test=seen_punc_var.rvalue(),
-                            body=self.done_cont,
-                            orelse=input_stmts
-                        )
-                    ]
+                    orelse=input_stmts
                 )
             ]
         else:
@@ -441,27 +436,20 @@ class CPSCompiler(StreamOpVisitor):
                 # Position 1: skip events until CatPunc, then pass through all tail events
                 return [
                     ast.If(
-                        test=ast.UnaryOp(
-                            op=ast.Not(),
-                            operand=seen_punc_var.rvalue()
+                        test=ast.Compare(
+                            left=phase_var.rvalue(),
+                            ops=[ast.Eq()],
+                            comparators=[ast.Constant(value=CatProjPhase.BEFORE_PUNC.value)]
                         ),
                         body=[
                             # Before punc: skip CatEvA and CatPunc
                             ast.If(
-                                test=ast.Call(
-                                    func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                    args=[event_expr, ast.Name(id='CatEvA', ctx=ast.Load())],
-                                    keywords=[]
-                                ),
+                                test=has_kind(event_expr, KIND_CATEVA),
                                 body=self.skip_cont,
                                 orelse=[
                                     ast.If(
-                                        test=ast.Call(
-                                            func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                            args=[event_expr, ast.Name(id='CatPunc', ctx=ast.Load())],
-                                            keywords=[]
-                                        ),
-                                        body=[seen_punc_var.assign(ast.Constant(value=True))] + self.skip_cont,
+                                        test=has_kind(event_expr, KIND_CATPUNC),
+                                        body=[phase_var.assign(ast.Constant(value=CatProjPhase.AFTER_PUNC.value))] + self.skip_cont,
                                         orelse=self.skip_cont
                                     )
                                 ]
@@ -471,60 +459,43 @@ class CPSCompiler(StreamOpVisitor):
                     )
                 ]
 
-            input_done_cont = [input_exhausted_var.assign(ast.Constant(value=True))] + self.done_cont
-
             input_compiler = CPSCompiler(self.ctx, input_done_cont, self.skip_cont, input_yield_cont)
-            input_stmts = coord.input_stream.accept(input_compiler)
+            input_stmts = input_compiler.visit(coord.input_stream)
 
             return [
                 ast.If(
-                    test=input_exhausted_var.rvalue(),
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value=CatProjPhase.EXHAUSTED.value)]
+                    ),
                     body=self.done_cont,
                     orelse=input_stmts
                 )
             ]
 
     def visit_CaseOp(self, node: 'CaseOp') -> List[ast.stmt]:
-        """Compile tag reading and branch routing with CPS."""
-        tag_read_var = self.ctx.state_var(node, 'tag_read')
+        """Compile tag reading and branch routing with CPS.
+
+        active_branch is -1 until the tag has been read, then 0 or 1.
+        """
         active_branch_var = self.ctx.state_var(node, 'active_branch')
 
         def tag_yield_cont(tag_expr):
             return [
-                tag_read_var.assign(ast.Constant(value=True)),
                 ast.If(
-                    test=ast.Call(
-                        func=ast.Name(id='isinstance', ctx=ast.Load()),
-                        args=[tag_expr, ast.Name(id='PlusPuncA', ctx=ast.Load())],
-                        keywords=[]
-                    ),
+                    test=has_tag_kind(tag_expr, KIND_PLUSPUNCA),
                     body=[
                         active_branch_var.assign(ast.Constant(value=0))
                     ],
                     orelse=[
                         ast.If(
-                            test=ast.Call(
-                                func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                args=[tag_expr, ast.Name(id='PlusPuncB', ctx=ast.Load())],
-                                keywords=[]
-                            ),
+                            test=has_tag_kind(tag_expr, KIND_PLUSPUNCB),
                             body=[
                                 active_branch_var.assign(ast.Constant(value=1))
                             ],
                             orelse=[
-                                ast.Raise(
-                                    exc=ast.Call(
-                                        func=ast.Name(id='RuntimeError', ctx=ast.Load()),
-                                        args=[
-                                            ast.JoinedStr(values=[
-                                                ast.Constant(value='Expected PlusPuncA or PlusPuncB tag, got '),
-                                                ast.FormattedValue(value=tag_expr, conversion=-1, format_spec=None)
-                                            ])
-                                        ],
-                                        keywords=[]
-                                    ),
-                                    cause=None
-                                )
+                                bad_tag(tag_expr)
                             ]
                         )
                     ]
@@ -532,17 +503,19 @@ class CPSCompiler(StreamOpVisitor):
             ] + self.skip_cont
 
         input_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, tag_yield_cont)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = input_compiler.visit(node.input_stream)
 
-        branch0_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        branch0_stmts = node.branches[0].accept(branch0_compiler)
+        branch0_stmts = self.visit(node.branches[0])
 
-        branch1_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch1_stmts = self.visit(node.branches[1])
 
         return [
             ast.If(
-                test=ast.UnaryOp(op=ast.Not(), operand=tag_read_var.rvalue()),
+                test=ast.Compare(
+                    left=active_branch_var.rvalue(),
+                    ops=[ast.Lt()],
+                    comparators=[ast.Constant(value=0)]
+                ),
                 body=input_stmts,
                 orelse=[
                     ast.If(
@@ -567,10 +540,9 @@ class CPSCompiler(StreamOpVisitor):
         ] + self.skip_cont
 
         s1_compiler = CPSCompiler(self.ctx, s1_done_cont, self.skip_cont, lambda _: self.skip_cont)
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
-        s2_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         return [
             ast.If(
@@ -588,22 +560,21 @@ class CPSCompiler(StreamOpVisitor):
         active_branch_var = self.ctx.state_var(node, 'active_branch')
 
         def cond_yield_cont(cond_expr):
+            # active_branch = not cond.value: a single read of the condition
+            # value, with False selecting branch 0 and True selecting branch 1
             return [
-                ast.If(
-                    test=ast.Attribute(value=cond_expr, attr='value', ctx=ast.Load()),
-                    body=[active_branch_var.assign(ast.Constant(value=0))],
-                    orelse=[active_branch_var.assign(ast.Constant(value=1))]
-                )
+                active_branch_var.assign(ast.UnaryOp(
+                    op=ast.Not(),
+                    operand=ast.Attribute(value=cond_expr, attr='value', ctx=ast.Load())
+                ))
             ] + self.skip_cont
 
         cond_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, cond_yield_cont)
-        cond_stmts = node.cond_stream.accept(cond_compiler)
+        cond_stmts = cond_compiler.visit(node.cond_stream)
 
-        branch0_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        branch0_stmts = node.branches[0].accept(branch0_compiler)
+        branch0_stmts = self.visit(node.branches[0])
 
-        branch1_compiler = CPSCompiler(self.ctx, self.done_cont, self.skip_cont, self.yield_cont)
-        branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch1_stmts = self.visit(node.branches[1])
 
         return [
             ast.If(
@@ -615,10 +586,9 @@ class CPSCompiler(StreamOpVisitor):
                 body=cond_stmts,
                 orelse=[
                     ast.If(
-                        test=ast.Compare(
-                            left=active_branch_var.rvalue(),
-                            ops=[ast.Eq()],
-                            comparators=[ast.Constant(value=0)]
+                        test=ast.UnaryOp(
+                            op=ast.Not(),
+                            operand=active_branch_var.rvalue()
                         ),
                         body=branch0_stmts,
                         orelse=branch1_stmts
@@ -726,7 +696,7 @@ class CPSCompiler(StreamOpVisitor):
             ] + self.skip_cont
 
         input_compiler = CPSCompiler(self.ctx, self.done_cont,self.skip_cont,poke)
-        return node.input_stream.accept(input_compiler)
+        return input_compiler.visit(node.input_stream)
 
     def visit_RegisterUpdateOp(self, node: RegisterUpdateOp) -> List[ast.stmt]:
         """Compile RegisterUpdateOp: update register with new value, then return DONE.
@@ -1,16 +1,18 @@
 """Direct compilation strategy - compiles to state machine with explicit result variable."""
 
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import List, Tuple, TYPE_CHECKING
 import ast
 
 from yoink.compilation.bufferop_state_compiler import BufferOpStateCompiler
 from yoink.compilation.runtime import Runtime
-from yoink.compilation.streamop_visitor import StreamOpVisitor
+from yoink.compilation.streamop_visitor import StreamOpVisitor, bad_tag, has_kind, has_tag_kind
 from yoink.compilation import CompilationContext, StateVar
+from yoink.compilation.context import STATE_LOCAL
 from yoink.compilation.streamop_reset_compiler import StreamOpResetCompiler
-from yoink.compilation.event_buffer_size import EventBufferSize
 from yoink.stream_ops.register_update_op import RegisterUpdateOp
+from yoink.stream_ops.catr import CatRState
+from yoink.event import KIND_CATEVA, KIND_CATPUNC, KIND_PLUSPUNCA, KIND_PLUSPUNCB
 
 if TYPE_CHECKING:
     from yoink.stream_ops.var import Var
@@ -29,12 +31,47 @@ if TYPE_CHECKING:
     from yoink.stream_ops.waitop import WaitOp
 
 
+# __next__ binds these globals to fast locals through default arguments, so the
+# per-tick references load a local instead of looking up a module global.
+NEXT_LOCALS = {
+    'DONE': '_DONE',
+    'CatEvA': '_CatEvA',
+    'CAT_PUNC': '_CAT_PUNC',
+    'PLUS_PUNC_A': '_PLUS_PUNC_A',
+    'PLUS_PUNC_B': '_PLUS_PUNC_B',
+    'next': '_next',
+}
+
+
+# Leaf nodes that the generated code repeats on nearly every branch are built once and
+# shared. The compiler does not need distinct node identities, and these nodes are never
+# mutated after construction (fix_missing_locations only fills in their missing positions).
+_LOCAL_NAMES = {name: ast.Name(id=local, ctx=ast.Load()) for name, local in NEXT_LOCALS.items()}
+_NONE = ast.Constant(value=None)
+_TRUE = ast.Constant(value=True)
+_RETURN_NONE = ast.Return(value=None)
+_CATR_FIRST = ast.Constant(value=CatRState.FIRST_STREAM.value)
+_CATR_SECOND = ast.Constant(value=CatRState.SECOND_STREAM.value)
+
+
+def _local(name: str) -> ast.Name:
+    """Load the __next__-local alias of the global `name`."""
+    return _LOCAL_NAMES[name]
+
+
+def _skip() -> ast.stmt:
+    """End a tick that produces no event: __next__ returns None, as the interpreter does."""
+    return _RETURN_NONE
+
+
 class DirectCompiler(StreamOpVisitor):
     """Direct compilation: state machine with explicit result variable.
 
     Generates code that assigns to a destination variable (dst).
     """
 
+    __slots__ = ('dst',)
+
     def __init__(self, ctx, dst: StateVar):
         super().__init__(ctx)
         self.dst = dst
@@ -51,7 +88,8 @@ class DirectCompiler(StreamOpVisitor):
         """
         module_ast = DirectCompiler._generate_module_ast(dataflow_graph)
 
-        code = compile(module_ast, '<generated>', 'exec')
+        # Generated code has no asserts or docstrings to keep, so compile at the top optimization level
+        code = compile(module_ast, '<generated>', 'exec', optimize=2)
 
         runtime = Runtime()
         return runtime.exec(code)
@@ -79,7 +117,7 @@ class DirectCompiler(StreamOpVisitor):
         Returns:
             The module AST
         """
-        ctx = CompilationContext()
+        ctx = CompilationContext(packed_state=True)
 
         # Map input vars to their indices
         ctx.var_to_input_idx = {var.id: i for i, var in enumerate(dataflow_graph.input_vars)}
@@ -87,24 +125,37 @@ class DirectCompiler(StreamOpVisitor):
         # Compile the output node
         result_var = StateVar('result', tmp=True)
         compiler = DirectCompiler(ctx, result_var)
-        output_stmts = dataflow_graph.outputs.accept(compiler)
+        output_stmts = compiler.visit(dataflow_graph.outputs)
 
         # Generate the class AST
         class_ast = DirectCompiler._generate_class_ast(dataflow_graph, ctx, output_stmts)
 
-        # Create and return the module AST
-        module_ast = ast.Module(body=[class_ast], type_ignores=[])
+        # Create and return the module AST, building each singleton's event once at module level
+        module_ast = ast.Module(body=ctx.singleton_event_defs() + [class_ast], type_ignores=[])
         ast.fix_missing_locations(module_ast)
         return module_ast
 
     @staticmethod
     def _generate_class_ast(dataflow_graph, ctx: CompilationContext, output_stmts: List[ast.stmt]) -> ast.ClassDef:
         """Generate the complete FlattenedIterator class for direct compilation."""
+        next_def = DirectCompiler._generate_next(ctx, output_stmts)
+        reset_def = DirectCompiler._generate_reset(dataflow_graph, ctx)
+        # __init__ sizes the state list, so it is generated once every slot is allocated
+        init_def = DirectCompiler._generate_init(dataflow_graph, ctx)
+
         body = [
-            DirectCompiler._generate_init(dataflow_graph, ctx),
+            # All per-instance state lives in these two attributes
+            ast.Assign(
+                targets=[ast.Name(id='__slots__', ctx=ast.Store())],
+                value=ast.Tuple(
+                    elts=[ast.Constant(value='inputs'), ast.Constant(value=STATE_LOCAL)],
+                    ctx=ast.Load()
+                )
+            ),
+            init_def,
             DirectCompiler._generate_iter(),
-            DirectCompiler._generate_next(ctx, output_stmts),
-            DirectCompiler._generate_reset(dataflow_graph, ctx),
+            next_def,
+            reset_def,
         ]
 
         return ast.ClassDef(
@@ -115,9 +166,46 @@ class DirectCompiler(StreamOpVisitor):
             decorator_list=[],
         )
 
+    @staticmethod
+    def _bind_state() -> ast.stmt:
+        """_state = self._state"""
+        return ast.Assign(
+            targets=[ast.Name(id=STATE_LOCAL, ctx=ast.Store())],
+            value=ast.Attribute(
+                value=ast.Name(id='self', ctx=ast.Load()),
+                attr=STATE_LOCAL,
+                ctx=ast.Load()
+            )
+        )
+
     @staticmethod
     def _generate_init(dataflow_graph, ctx: CompilationContext) -> ast.FunctionDef:
         """Generate __init__ method with state initialization."""
+        # Each input's iterator gets its own state slot, so reading a Var skips the self.inputs lookup
+        state_init_stmts = [
+            ctx.state_var(var, 'input').assign(
+                ast.Subscript(
+                    value=ast.Attribute(
+                        value=ast.Name(id='self', ctx=ast.Load()),
+                        attr='inputs',
+                        ctx=ast.Load()
+                    ),
+                    slice=ast.Constant(value=idx),
+                    ctx=ast.Load()
+                )
+            )
+            for idx, var in enumerate(dataflow_graph.input_vars)
+        ]
+        # Add state initializers from all nodes
+        state_init_stmts.extend(StreamOpResetCompiler(ctx).compile_all(dataflow_graph.nodes))
+        # TODO: This will have to do for now... we should also probably track what bufferops exist in a
+        # graph. THen we can make this BufferOpStateCompiler nonrecursive, and just directly walk the particular set of
+        # bufferop computations
+        for node in dataflow_graph.nodes:
+            from yoink.stream_ops.emitop import EmitOp
+            if isinstance(node,EmitOp):
+                state_init_stmts.extend(BufferOpStateCompiler(ctx).visit(node.buffer_op))
+
         body: List[ast.stmt] = [
             # self.inputs = list(input_iterators)
             ast.Assign(
@@ -131,18 +219,24 @@ class DirectCompiler(StreamOpVisitor):
                     args=[ast.Name(id='input_iterators', ctx=ast.Load())],
                     keywords=[]
                 )
+            ),
+            # self._state = _state = [None] * <number of state slots>
+            ast.Assign(
+                targets=[
+                    ast.Attribute(
+                        value=ast.Name(id='self', ctx=ast.Load()),
+                        attr=STATE_LOCAL,
+                        ctx=ast.Store()
+                    ),
+                    ast.Name(id=STATE_LOCAL, ctx=ast.Store())
+                ],
+                value=ast.BinOp(
+                    left=ast.List(elts=[_NONE], ctx=ast.Load()),
+                    op=ast.Mult(),
+                    right=ast.Constant(value=ctx.state_slot_count)
+                )
             )
-        ]
-
-        # Add state initializers from all nodes
-        body.extend(StreamOpResetCompiler(ctx).compile_all(dataflow_graph.nodes))
-        # TODO: This will have to do for now... we should also probably track what bufferops exist in a
-        # graph. THen we can make this BufferOpStateCompiler nonrecursive, and just directly walk the particular set of
-        # bufferop computations
-        for node in dataflow_graph.nodes:
-            from yoink.stream_ops.emitop import EmitOp
-            if isinstance(node,EmitOp):
-                body.extend(BufferOpStateCompiler(ctx).visit(node.buffer_op))
+        ] + state_init_stmts
 
         return ast.FunctionDef(
             name='__init__',
@@ -181,13 +275,17 @@ class DirectCompiler(StreamOpVisitor):
 
     @staticmethod
     def _generate_next(ctx: CompilationContext, output_stmts: List[ast.stmt]) -> ast.FunctionDef:
-        """Generate __next__ method."""
-        body = output_stmts + [
+        """Generate __next__ method.
+
+        Each call runs one tick. A tick that produces no event returns None as soon as it is
+        known to be silent, handing control back to the caller as the interpreter does.
+        """
+        body = [DirectCompiler._bind_state()] + output_stmts + [
             ast.If(
                 test=ast.Compare(
                     left=ast.Name(id='result', ctx=ast.Load()),
                     ops=[ast.Is()],
-                    comparators=[ast.Name(id='DONE', ctx=ast.Load())]
+                    comparators=[_local('DONE')]
                 ),
                 body=[ast.Raise(exc=ast.Call(
                     func=ast.Name(id='StopIteration', ctx=ast.Load()),
@@ -202,12 +300,13 @@ class DirectCompiler(StreamOpVisitor):
         return ast.FunctionDef(
             name='__next__',
             args=ast.arguments(
-                args=[ast.arg(arg='self', annotation=None)],
+                args=[ast.arg(arg='self', annotation=None)] +
+                     [ast.arg(arg=alias, annotation=None) for alias in NEXT_LOCALS.values()],
                 vararg=None,
                 kwonlyargs=[],
                 kw_defaults=[],
                 kwarg=None,
-                defaults=[],
+                defaults=[ast.Name(id=name, ctx=ast.Load()) for name in NEXT_LOCALS],
                 posonlyargs=[]
             ),
             body=body,
@@ -218,7 +317,7 @@ class DirectCompiler(StreamOpVisitor):
     @staticmethod
     def _generate_reset(dataflow_graph, ctx: CompilationContext) -> ast.FunctionDef:
 
-        body = StreamOpResetCompiler(ctx).compile_all(dataflow_graph.nodes)
+        body = [DirectCompiler._bind_state()] + StreamOpResetCompiler(ctx).compile_all(dataflow_graph.nodes)
 
         return ast.FunctionDef(
             name='reset',
@@ -236,46 +335,70 @@ class DirectCompiler(StreamOpVisitor):
             returns=None,
         )
 
+    def visit(self, node) -> List[ast.stmt]:
+        """Compile node into dst.
+
+        The code for a node depends only on the node and the destination, so when the same op is
+        compiled into the same destination again (e.g. a CaseOp input cast in both branches),
+        the statements from the first compilation are reused.
+        """
+        key = (id(node), self.dst.name)
+        stmts = self.ctx.compiled_stmts.get(key)
+        if stmts is None:
+            stmts = super().visit(node)
+            self.ctx.compiled_stmts[key] = stmts
+        return stmts
+
+    def _compile_branches(self, branches) -> Tuple[List[ast.stmt], List[ast.stmt]]:
+        """Compile both branches of a CaseOp/CondOp into dst, sharing the code if they are the same op."""
+        branch0_stmts = self.visit(branches[0])
+        if branches[1] is branches[0]:
+            return branch0_stmts, branch0_stmts
+        branch1_stmts = self.visit(branches[1])
+        return branch0_stmts, branch1_stmts
+
+    def _dump(self, node) -> str:
+        """ast.dump of the statements node compiles to in dst, computed once per node and dst."""
+        key = (id(node), self.dst.name)
+        dump = self.ctx.compiled_dumps.get(key)
+        if dump is None:
+            dump = ast.dump(ast.Module(body=self.visit(node), type_ignores=[]))
+            self.ctx.compiled_dumps[key] = dump
+        return dump
+
+    def _route_branches(self, test: ast.expr, branches,
+                        branch0_stmts: List[ast.stmt], branch1_stmts: List[ast.stmt]) -> List[ast.stmt]:
+        """Compile to: if test: branch0 else: branch1
+
+        If both branches compiled to the same code, the dispatch is dropped and branch0 is emitted alone.
+        """
+        if branch0_stmts is branch1_stmts or self._dump(branches[0]) == self._dump(branches[1]):
+            return branch0_stmts
+        return [ast.If(test=test, body=branch0_stmts, orelse=branch1_stmts)]
+
     def visit_Var(self, node: 'Var') -> List[ast.stmt]:
-        """Compile to: try: dst = next(self.inputs[idx]) except StopIteration: dst = DONE"""
-        input_idx = self.ctx.var_to_input_idx[node.id]
+        """Compile to: dst = next(input, DONE); if dst is None: return None
+
+        input is the Var's iterator, stored in its state slot by __init__. The two-argument next
+        yields DONE once the input is exhausted, without setting up a StopIteration handler. A
+        None read from an input ends the tick here as a silent one, so no enclosing op ever sees None.
+        """
+        input_var = self.ctx.state_var(node, 'input')
 
         return [
-            ast.Try(
-                body=[
-                    ast.Assign(
-                        targets=[self.dst.lvalue()],
-                        value=ast.Call(
-                            func=ast.Name(id='next', ctx=ast.Load()),
-                            args=[
-                                ast.Subscript(
-                                    value=ast.Attribute(
-                                        value=ast.Name(id='self', ctx=ast.Load()),
-                                        attr='inputs',
-                                        ctx=ast.Load()
-                                    ),
-                                    slice=ast.Constant(value=input_idx),
-                                    ctx=ast.Load()
-                                )
-                            ],
-                            keywords=[]
-                        )
-                    )
-                ],
-                handlers=[
-                    ast.ExceptHandler(
-                        type=ast.Name(id='StopIteration', ctx=ast.Load()),
-                        name=None,
-                        body=[
-                            ast.Assign(
-                                targets=[self.dst.lvalue()],
-                                value=ast.Name(id='DONE', ctx=ast.Load())
-                            )
-                        ]
-                    )
-                ],
-                orelse=[],
-                finalbody=[]
+            self.dst.assign(ast.Call(
+                func=_local('next'),
+                args=[input_var.rvalue(), _local('DONE')],
+                keywords=[]
+            )),
+            ast.If(
+                test=ast.Compare(
+                    left=self.dst.rvalue(),
+                    ops=[ast.Is()],
+                    comparators=[_NONE]
+                ),
+                body=[_skip()],
+                orelse=[]
             )
         ]
 
@@ -284,27 +407,27 @@ class DirectCompiler(StreamOpVisitor):
         return [
             ast.Assign(
                 targets=[self.dst.lvalue()],
-                value=ast.Name(id='DONE', ctx=ast.Load())
+                value=_local('DONE')
             )
         ]
 
     def visit_SingletonOp(self, node: 'SingletonOp') -> List[ast.stmt]:
-        """Emit value once, then DONE."""
+        """Emit value once, then DONE.
+
+        The event for the value is built once when the module is loaded, not on every firing.
+        """
         exhausted_var = self.ctx.state_var(node, 'exhausted')
+        event_name = self.ctx.singleton_event(node)
 
         return [
             ast.If(
                 test=exhausted_var.rvalue(),
                 body=[
-                    self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+                    self.dst.assign(_local('DONE'))
                 ],
                 orelse=[
-                    exhausted_var.assign(ast.Constant(value=True)),
-                    self.dst.assign(ast.Call(
-                        func=ast.Name(id='BaseEvent', ctx=ast.Load()),
-                        args=[ast.Constant(value=node.value)],
-                        keywords=[]
-                    ))
+                    exhausted_var.assign(_TRUE),
+                    self.dst.assign(ast.Name(id=event_name, ctx=ast.Load()))
                 ]
             )
         ]
@@ -313,12 +436,7 @@ class DirectCompiler(StreamOpVisitor):
         """Compile reset calls on all nodes in reset_set."""
 
         reset_stmts = StreamOpResetCompiler(self.ctx).compile_all(node.reset_set)
-        reset_stmts.append(
-            ast.Assign(
-                targets=[self.dst.lvalue()],
-                value=ast.Constant(value=None)
-            )
-        )
+        reset_stmts.append(_skip())
 
         return reset_stmts
 
@@ -326,10 +444,9 @@ class DirectCompiler(StreamOpVisitor):
         """Emit tag, then compile input stream."""
         tag_var = self.ctx.state_var(node, 'tag_emitted')
 
-        tag_class = 'PlusPuncA' if node.position == 0 else 'PlusPuncB'
+        tag_event = 'PLUS_PUNC_A' if node.position == 0 else 'PLUS_PUNC_B'
 
-        input_compiler = DirectCompiler(self.ctx, self.dst)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = self.visit(node.input_stream)
 
         return [
             ast.If(
@@ -338,12 +455,8 @@ class DirectCompiler(StreamOpVisitor):
                     operand=tag_var.rvalue()
                 ),
                 body=[
-                    tag_var.assign(ast.Constant(value=True)),
-                    self.dst.assign(ast.Call(
-                        func=ast.Name(id=tag_class, ctx=ast.Load()),
-                        args=[],
-                        keywords=[]
-                    ))
+                    tag_var.assign(_TRUE),
+                    self.dst.assign(_local(tag_event))
                 ],
                 orelse=input_stmts
             )
@@ -351,21 +464,17 @@ class DirectCompiler(StreamOpVisitor):
 
     def visit_UnsafeCast(self, node: UnsafeCast) -> List[ast.stmt]:
         """Pass through to input stream."""
-        input_compiler = DirectCompiler(self.ctx, self.dst)
-        return node.input_stream.accept(input_compiler)
+        return self.visit(node.input_stream)
 
     def visit_CatR(self, node: CatR) -> List[ast.stmt]:
-        from yoink.stream_ops.catr import CatRState
-
         state_var = self.ctx.state_var(node, 'state')
         tmp = self.ctx.allocate_temp()
 
         # Compile children
         s1_compiler = DirectCompiler(self.ctx, tmp)
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
-        s2_compiler = DirectCompiler(self.ctx, self.dst)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         # Build the state machine
         return [
@@ -373,41 +482,25 @@ class DirectCompiler(StreamOpVisitor):
                 test=ast.Compare(
                     left=state_var.rvalue(),
                     ops=[ast.Eq()],
-                    comparators=[ast.Constant(value=CatRState.FIRST_STREAM.value)]
+                    comparators=[_CATR_FIRST]
                 ),
                 body=s1_stmts + [
                     ast.If(
                         test=ast.Compare(
                             left=tmp.rvalue(),
                             ops=[ast.Is()],
-                            comparators=[ast.Name(id='DONE', ctx=ast.Load())]
+                            comparators=[_local('DONE')]
                         ),
                         body=[
-                            state_var.assign(ast.Constant(value=CatRState.SECOND_STREAM.value)),
+                            state_var.assign(_CATR_SECOND),
+                            self.dst.assign(_local('CAT_PUNC'))
+                        ],
+                        orelse=[
                             self.dst.assign(ast.Call(
-                                func=ast.Name(id='CatPunc', ctx=ast.Load()),
-                                args=[],
+                                func=_local('CatEvA'),
+                                args=[tmp.rvalue()],
                                 keywords=[]
                             ))
-                        ],
-                        orelse=[
-                            ast.If(
-                                test=ast.Compare(
-                                    left=tmp.rvalue(),
-                                    ops=[ast.Is()],
-                                    comparators=[ast.Constant(value=None)]
-                                ),
-                                body=[
-                                    self.dst.assign(ast.Constant(value=None))
-                                ],
-                                orelse=[
-                                    self.dst.assign(ast.Call(
-                                        func=ast.Name(id='CatEvA', ctx=ast.Load()),
-                                        args=[tmp.rvalue()],
-                                        keywords=[]
-                                    ))
-                                ]
-                            )
                         ]
                     )
                 ],
@@ -416,82 +509,132 @@ class DirectCompiler(StreamOpVisitor):
         ]
 
     def visit_CatProj(self, node: CatProj) -> List[ast.stmt]:
-        """Inline coordinator logic with event filtering based on position."""
-        coord = node.coordinator
-        coord_id = coord.id
+        """Inline coordinator logic with event filtering based on position.
+
+        The coordinator's progress is a single CatProjPhase value: BEFORE_PUNC, AFTER_PUNC
+        or EXHAUSTED, so each position dispatches on one comparison.
+        """
+        from yoink.stream_ops.catproj import CatProjPhase
+        from yoink.stream_ops.var import Var
 
-        seen_punc_var = self.ctx.state_var(coord, 'seen_punc')
-        # TODO: get rid of the input exhausted var
-        input_exhausted_var = self.ctx.state_var(coord, 'input_exhausted')
+        coord = node.coordinator
+        phase_var = self.ctx.state_var(coord, 'phase')
 
         event_tmp = self.ctx.allocate_temp()
         input_compiler = DirectCompiler(self.ctx, event_tmp)
-        input_stmts = coord.input_stream.accept(input_compiler)
+        input_stmts = input_compiler.visit(coord.input_stream)
+
+        # if event_tmp is DONE: phase = EXHAUSTED; dst = DONE
+        input_done_check = ast.Compare(
+            left=event_tmp.rvalue(),
+            ops=[ast.Is()],
+            comparators=[_local('DONE')]
+        )
+        input_done_stmts = [
+            phase_var.assign(ast.Constant(value=CatProjPhase.EXHAUSTED.value)),
+            self.dst.assign(_local('DONE'))
+        ]
 
         if node.position == 0:
             # Position 0: extract CatEvA values until CatPunc
             return [
                 ast.If(
-                    test=input_exhausted_var.rvalue(),
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.NotEq()],
+                        comparators=[ast.Constant(value=CatProjPhase.BEFORE_PUNC.value)]
+                    ),
                     body=[
-                        self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+                        self.dst.assign(_local('DONE'))
                     ],
-                    orelse=[
+                    orelse=input_stmts + [
                         ast.If(
-                            test=seen_punc_var.rvalue(),
+                            test=input_done_check,
+                            body=input_done_stmts,
+                            orelse=[
+                                ast.If(
+                                    test=has_kind(event_tmp.rvalue(), KIND_CATEVA),
+                                    body=[
+                                        self.dst.assign(ast.Attribute(
+                                            value=event_tmp.rvalue(),
+                                            attr='value',
+                                            ctx=ast.Load()
+                                        ))
+                                    ],
+                                    orelse=[
+                                        ast.If(
+                                            test=has_kind(event_tmp.rvalue(), KIND_CATPUNC),
+                                            body=[
+                                                phase_var.assign(ast.Constant(value=CatProjPhase.AFTER_PUNC.value)),
+                                                self.dst.assign(_local('DONE'))
+                                            ],
+                                            orelse=[_skip()]
+                                        )
+                                    ]
+                                )
+                            ]
+                        )
+                    ]
+                )
+            ]
+        elif isinstance(coord.input_stream, Var):
+            # Position 1 reading an input directly: skip the head in a single for loop over the
+            # input iterator rather than one tick per skipped event, then pass through the tail.
+            # A None from the input means no event is ready yet, so it ends the tick as a silent one.
+            input_var = self.ctx.state_var(coord.input_stream, 'input')
+            return [
+                ast.If(
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value=CatProjPhase.BEFORE_PUNC.value)]
+                    ),
+                    body=[
+                        ast.For(
+                            target=event_tmp.lvalue(),
+                            iter=input_var.rvalue(),
                             body=[
-                                self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
-                            ],
-                            orelse=input_stmts + [
                                 ast.If(
                                     test=ast.Compare(
                                         left=event_tmp.rvalue(),
                                         ops=[ast.Is()],
-                                        comparators=[ast.Name(id='DONE', ctx=ast.Load())]
+                                        comparators=[_NONE]
                                     ),
-                                    body=[
-                                        input_exhausted_var.assign(ast.Constant(value=True)),
-                                        self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
-                                    ],
+                                    body=[_skip()],
                                     orelse=[
                                         ast.If(
-                                            test=ast.Call(
-                                                func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                                args=[
-                                                    event_tmp.rvalue(),
-                                                    ast.Name(id='CatEvA', ctx=ast.Load())
-                                                ],
-                                                keywords=[]
-                                            ),
+                                            test=has_kind(event_tmp.rvalue(), KIND_CATPUNC),
                                             body=[
-                                                self.dst.assign(ast.Attribute(
-                                                    value=event_tmp.rvalue(),
-                                                    attr='value',
-                                                    ctx=ast.Load()
-                                                ))
+                                                phase_var.assign(ast.Constant(value=CatProjPhase.AFTER_PUNC.value)),
+                                                ast.Break()
                                             ],
-                                            orelse=[
-                                                ast.If(
-                                                    test=ast.Call(
-                                                        func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                                        args=[
-                                                            event_tmp.rvalue(),
-                                                            ast.Name(id='CatPunc', ctx=ast.Load())
-                                                        ],
-                                                        keywords=[]
-                                                    ),
-                                                    body=[
-                                                        seen_punc_var.assign(ast.Constant(value=True)),
-                                                        self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
-                                                    ],
-                                                    orelse=[
-                                                        self.dst.assign(ast.Constant(value=None))
-                                                    ]
-                                                )
-                                            ]
+                                            orelse=[]
                                         )
                                     ]
                                 )
+                            ],
+                            orelse=[
+                                phase_var.assign(ast.Constant(value=CatProjPhase.EXHAUSTED.value))
+                            ]
+                        )
+                    ],
+                    orelse=[]
+                ),
+                ast.If(
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value=CatProjPhase.EXHAUSTED.value)]
+                    ),
+                    body=[
+                        self.dst.assign(_local('DONE'))
+                    ],
+                    orelse=input_stmts + [
+                        ast.If(
+                            test=input_done_check,
+                            body=input_done_stmts,
+                            orelse=[
+                                self.dst.assign(event_tmp.rvalue())
                             ]
                         )
                     ]
@@ -501,62 +644,36 @@ class DirectCompiler(StreamOpVisitor):
             # Position 1: skip events until CatPunc, then pass through all tail events
             return [
                 ast.If(
-                    test=input_exhausted_var.rvalue(),
+                    test=ast.Compare(
+                        left=phase_var.rvalue(),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value=CatProjPhase.EXHAUSTED.value)]
+                    ),
                     body=[
-                        self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+                        self.dst.assign(_local('DONE'))
                     ],
                     orelse=input_stmts + [
                         ast.If(
-                            test=ast.Compare(
-                                left=event_tmp.rvalue(),
-                                ops=[ast.Is()],
-                                comparators=[ast.Name(id='DONE', ctx=ast.Load())]
-                            ),
-                            body=[
-                                input_exhausted_var.assign(ast.Constant(value=True)),
-                                self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
-                            ],
+                            test=input_done_check,
+                            body=input_done_stmts,
                             orelse=[
                                 # Check if we've seen punc yet
                                 ast.If(
-                                    test=ast.UnaryOp(
-                                        op=ast.Not(),
-                                        operand=seen_punc_var.rvalue()
+                                    test=ast.Compare(
+                                        left=phase_var.rvalue(),
+                                        ops=[ast.Eq()],
+                                        comparators=[ast.Constant(value=CatProjPhase.BEFORE_PUNC.value)]
                                     ),
                                     body=[
                                         # Before punc: skip CatEvA and CatPunc
                                         ast.If(
-                                            test=ast.Call(
-                                                func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                                args=[
-                                                    event_tmp.rvalue(),
-                                                    ast.Name(id='CatEvA', ctx=ast.Load())
-                                                ],
-                                                keywords=[]
-                                            ),
+                                            test=has_kind(event_tmp.rvalue(), KIND_CATPUNC),
                                             body=[
-                                                self.dst.assign(ast.Constant(value=None))
+                                                phase_var.assign(ast.Constant(value=CatProjPhase.AFTER_PUNC.value))
                                             ],
-                                            orelse=[
-                                                ast.If(
-                                                    test=ast.Call(
-                                                        func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                                        args=[
-                                                            event_tmp.rvalue(),
-                                                            ast.Name(id='CatPunc', ctx=ast.Load())
-                                                        ],
-                                                        keywords=[]
-                                                    ),
-                                                    body=[
-                                                        seen_punc_var.assign(ast.Constant(value=True)),
-                                                        self.dst.assign(ast.Constant(value=None))
-                                                    ],
-                                                    orelse=[
-                                                        self.dst.assign(ast.Constant(value=None))
-                                                    ]
-                                                )
-                                            ]
-                                        )
+                                            orelse=[]
+                                        ),
+                                        _skip()
                                     ],
                                     orelse=[
                                         # After punc: pass through all events
@@ -570,129 +687,89 @@ class DirectCompiler(StreamOpVisitor):
             ]
 
     def visit_CaseOp(self, node: CaseOp) -> List[ast.stmt]:
-        """Compile tag reading and branch routing."""
-        tag_read_var = self.ctx.state_var(node, 'tag_read')
+        """Compile tag reading and branch routing.
+
+        active_branch is -1 until the tag has been read, then 0 or 1.
+        """
         active_branch_var = self.ctx.state_var(node, 'active_branch')
 
         tag_tmp = self.ctx.allocate_temp()
         input_compiler = DirectCompiler(self.ctx, tag_tmp)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = input_compiler.visit(node.input_stream)
 
-        branch0_compiler = DirectCompiler(self.ctx, self.dst)
-        branch0_stmts = node.branches[0].accept(branch0_compiler)
-
-        branch1_compiler = DirectCompiler(self.ctx, self.dst)
-        branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch0_stmts, branch1_stmts = self._compile_branches(node.branches)
 
         # Build nested if/elif structure for tag reading
         return [
             ast.If(
-                test=ast.UnaryOp(
-                    op=ast.Not(),
-                    operand=tag_read_var.rvalue()
+                test=ast.Compare(
+                    left=active_branch_var.rvalue(),
+                    ops=[ast.Lt()],
+                    comparators=[ast.Constant(value=0)]
                 ),
                 body=input_stmts + [
                     ast.If(
                         test=ast.Compare(
                             left=tag_tmp.rvalue(),
                             ops=[ast.Is()],
-                            comparators=[ast.Constant(value=None)]
+                            comparators=[_local('DONE')]
                         ),
                         body=[
-                            self.dst.assign(ast.Constant(value=None))
+                            self.dst.assign(_local('DONE'))
                         ],
                         orelse=[
+                            # Check tag type and set active_branch
                             ast.If(
-                                test=ast.Compare(
-                                    left=tag_tmp.rvalue(),
-                                    ops=[ast.Is()],
-                                    comparators=[ast.Name(id='DONE', ctx=ast.Load())]
-                                ),
+                                test=has_tag_kind(tag_tmp.rvalue(), KIND_PLUSPUNCA),
                                 body=[
-                                    self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+                                    active_branch_var.assign(ast.Constant(value=0))
                                 ],
                                 orelse=[
-                                    # Set tag_read = True
-                                    tag_read_var.assign(ast.Constant(value=True)),
-                                    # Check tag type and set active_branch
                                     ast.If(
-                                        test=ast.Call(
-                                            func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                            args=[
-                                                tag_tmp.rvalue(),
-                                                ast.Name(id='PlusPuncA', ctx=ast.Load())
-                                            ],
-                                            keywords=[]
-                                        ),
+                                        test=has_tag_kind(tag_tmp.rvalue(), KIND_PLUSPUNCB),
                                         body=[
-                                            active_branch_var.assign(ast.Constant(value=0))
+                                            active_branch_var.assign(ast.Constant(value=1))
                                         ],
                                         orelse=[
-                                            ast.If(
-                                                test=ast.Call(
-                                                    func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                                    args=[
-                                                        tag_tmp.rvalue(),
-                                                        ast.Name(id='PlusPuncB', ctx=ast.Load())
-                                                    ],
-                                                    keywords=[]
-                                                ),
-                                                body=[
-                                                    active_branch_var.assign(ast.Constant(value=1))
-                                                ],
-                                                orelse=[
-                                                    ast.Raise(
-                                                        exc=ast.Call(
-                                                            func=ast.Name(id='RuntimeError', ctx=ast.Load()),
-                                                            args=[
-                                                                ast.JoinedStr(values=[
-                                                                    ast.Constant(value='Expected PlusPuncA or PlusPuncB tag, got '),
-                                                                    ast.FormattedValue(
-                                                                        value=tag_tmp.rvalue(),
-                                                                        conversion=-1,
-                                                                        format_spec=None
-                                                                    )
-                                                                ])
-                                                            ],
-                                                            keywords=[]
-                                                        ),
-                                                        cause=None
-                                                    )
-                                                ]
-                                            )
+                                            bad_tag(tag_tmp.rvalue())
                                         ]
-                                    ),
-                                    # Set dst = None
-                                    self.dst.assign(ast.Constant(value=None))
+                                    )
                                 ]
-                            )
+                            ),
+                            # The tag itself produces no event
+                            _skip()
                         ]
                     )
                 ],
-                orelse=[
-                    # Route to appropriate branch
-                    ast.If(
-                        test=ast.Compare(
-                            left=active_branch_var.rvalue(),
-                            ops=[ast.Eq()],
-                            comparators=[ast.Constant(value=0)]
-                        ),
-                        body=branch0_stmts,
-                        orelse=branch1_stmts
-                    )
-                ]
+                # Route to appropriate branch
+                orelse=self._route_branches(
+                    ast.Compare(
+                        left=active_branch_var.rvalue(),
+                        ops=[ast.Eq()],
+                        comparators=[ast.Constant(value=0)]
+                    ),
+                    node.branches,
+                    branch0_stmts,
+                    branch1_stmts
+                )
             )
         ]
 
     def visit_SinkThen(self, node: SinkThen) -> List[ast.stmt]:
+        """Drain the first stream, then pass through the second.
+
+        The tick that sees the first stream finish only flips first_exhausted and produces no event;
+        __next__ runs the next tick straight away, which enters the second stream. This keeps a
+        single copy of the second stream's code, instead of one per arm, which doubled the code
+        for each nested SinkThen.
+        """
         exhausted_var = self.ctx.state_var(node, 'first_exhausted')
 
         val_tmp = self.ctx.allocate_temp()
         s1_compiler = DirectCompiler(self.ctx, val_tmp)
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
-        s2_compiler = DirectCompiler(self.ctx, self.dst)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         return [
             ast.If(
@@ -705,21 +782,17 @@ class DirectCompiler(StreamOpVisitor):
                         test=ast.Compare(
                             left=val_tmp.rvalue(),
                             ops=[ast.Is()],
-                            comparators=[ast.Name(id='DONE', ctx=ast.Load())]
+                            comparators=[_local('DONE')]
                         ),
                         body=[
                             ast.Assign(
                                 targets=[exhausted_var.lvalue()],
-                                value=ast.Constant(value=True)
-                            )
-                        ] + s2_stmts,
-                        orelse=[
-                            ast.Assign(
-                                targets=[self.dst.lvalue()],
-                                value=ast.Constant(value=None)
+                                value=_TRUE
                             )
-                        ]
-                    )
+                        ],
+                        orelse=[]
+                    ),
+                    _skip()
                 ],
                 orelse=s2_stmts
             )
@@ -730,13 +803,9 @@ class DirectCompiler(StreamOpVisitor):
 
         cond_tmp = self.ctx.allocate_temp()
         cond_compiler = DirectCompiler(self.ctx, cond_tmp)
-        cond_stmts = node.cond_stream.accept(cond_compiler)
+        cond_stmts = cond_compiler.visit(node.cond_stream)
 
-        branch0_compiler = DirectCompiler(self.ctx, self.dst)
-        branch0_stmts = node.branches[0].accept(branch0_compiler)
-
-        branch1_compiler = DirectCompiler(self.ctx, self.dst)
-        branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch0_stmts, branch1_stmts = self._compile_branches(node.branches)
 
         # Build nested if structure for condition reading
         return [
@@ -744,62 +813,44 @@ class DirectCompiler(StreamOpVisitor):
                 test=ast.Compare(
                     left=active_branch_var.rvalue(),
                     ops=[ast.Is()],
-                    comparators=[ast.Constant(value=None)]
+                    comparators=[_NONE]
                 ),
                 body=cond_stmts + [
                     ast.If(
                         test=ast.Compare(
                             left=cond_tmp.rvalue(),
                             ops=[ast.Is()],
-                            comparators=[ast.Constant(value=None)]
+                            comparators=[_local('DONE')]
                         ),
                         body=[
-                            self.dst.assign(ast.Constant(value=None))
+                            self.dst.assign(_local('DONE'))
                         ],
                         orelse=[
-                            ast.If(
-                                test=ast.Compare(
-                                    left=cond_tmp.rvalue(),
-                                    ops=[ast.Is()],
-                                    comparators=[ast.Name(id='DONE', ctx=ast.Load())]
-                                ),
-                                body=[
-                                    self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
-                                ],
-                                orelse=[
-                                    # Extract boolean value and set active_branch
-                                    ast.If(
-                                        test=ast.Attribute(
-                                            value=cond_tmp.rvalue(),
-                                            attr='value',
-                                            ctx=ast.Load()
-                                        ),
-                                        body=[
-                                            active_branch_var.assign(ast.Constant(value=0))
-                                        ],
-                                        orelse=[
-                                            active_branch_var.assign(ast.Constant(value=1))
-                                        ]
-                                    ),
-                                    # Set dst = None
-                                    self.dst.assign(ast.Constant(value=None))
-                                ]
-                            )
+                            # active_branch = not cond_tmp.value
+                            # (False selects branch 0, True selects branch 1)
+                            active_branch_var.assign(ast.UnaryOp(
+                                op=ast.Not(),
+                                operand=ast.Attribute(
+                                    value=cond_tmp.rvalue(),
+                                    attr='value',
+                                    ctx=ast.Load()
+                                )
+                            )),
+                            # The condition itself produces no event
+                            _skip()
                         ]
                     )
                 ],
-                orelse=[
-                    # Route to appropriate branch
-                    ast.If(
-                        test=ast.Compare(
-                            left=active_branch_var.rvalue(),
-                            ops=[ast.Eq()],
-                            comparators=[ast.Constant(value=0)]
-                        ),
-                        body=branch0_stmts,
-                        orelse=branch1_stmts
-                    )
-                ]
+                # Route to appropriate branch
+                orelse=self._route_branches(
+                    ast.UnaryOp(
+                        op=ast.Not(),
+                        operand=active_branch_var.rvalue()
+                    ),
+                    node.branches,
+                    branch0_stmts,
+                    branch1_stmts
+                )
             )
         ]
 
@@ -836,7 +887,7 @@ class DirectCompiler(StreamOpVisitor):
                 body=bufferop_stmts + [
                     emit_index_var.assign(ast.Constant(value=0)),
                     phase_var.assign(ast.Constant(value=EmitOpPhase.EMITTING.value)),
-                    self.dst.assign(ast.Constant(value=None))
+                    _skip()
                 ],
                 orelse=[
                     ast.If(
@@ -870,7 +921,7 @@ class DirectCompiler(StreamOpVisitor):
                             )
                         ],
                         orelse=[
-                            self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+                            self.dst.assign(_local('DONE'))
                         ]
                     )
                 ]
@@ -891,18 +942,15 @@ class DirectCompiler(StreamOpVisitor):
 
         # Compile input stream
         input_compiler = DirectCompiler(self.ctx, event_tmp)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = input_compiler.visit(node.input_stream)
 
-        buffer_size = EventBufferSize(self.ctx).visit(node.stream_type)
         #   <...input_stmts...>(event_tmp)
         #   if event_tmp == DONE:
         #     dst := DONE
-        #   elif event_tmp is None:
-        #     dst := None
         #   else:
         #     buffer_var[buffer_write_idx] = event_tmp
         #     buffer_write_idx += 1
-        #     dst := None
+        #     return None
 
         return input_stmts + [
                     # Check what the input returned
@@ -910,44 +958,30 @@ class DirectCompiler(StreamOpVisitor):
                         test=ast.Compare(
                             left=event_tmp.rvalue(),
                             ops=[ast.Is()],
-                            comparators=[ast.Name(id='DONE', ctx=ast.Load())]
+                            comparators=[_local('DONE')]
                         ),
-                        body=[self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))],
+                        body=[self.dst.assign(_local('DONE'))],
                         orelse=[
-                            ast.If(
-                                test=ast.Compare(
-                                    left=event_tmp.rvalue(),
-                                    ops=[ast.Is()],
-                                    comparators=[ast.Constant(value=None)]
-                                ),
-                                body=[
-                                    # No event yet, return None
-                                    self.dst.assign(ast.Constant(value=None))
+                            # buffer_var[buffer_write_idx] = event_tmp
+                            ast.Assign(
+                                targets=[
+                                    ast.Subscript(
+                                        value=buffer_var.rvalue(),
+                                        slice=buffer_write_idx.rvalue(),
+                                        ctx=ast.Store()
+                                    )
                                 ],
-                                orelse=[
-                                    # buffer_var[buffer_write_idx] = event_tmp
-                                    ast.Assign(
-                                        targets=[
-                                            ast.Subscript(
-                                                value=buffer_var.rvalue(),
-                                                slice=buffer_write_idx.rvalue(),
-                                                ctx=ast.Store()
-                                            )
-                                        ],
-                                        value=event_tmp.rvalue()
-                                    ),
-                                    # buffer_write_idx += 1
-                                    buffer_write_idx.assign(
-                                        ast.BinOp(
-                                            left=buffer_write_idx.rvalue(),
-                                            op=ast.Add(),
-                                            right=ast.Constant(value=1)
-                                        )
-                                    ),
-                                    # dst := None
-                                    self.dst.assign(ast.Constant(value=None))
-                                ]
-                            )
+                                value=event_tmp.rvalue()
+                            ),
+                            # buffer_write_idx += 1
+                            buffer_write_idx.assign(
+                                ast.BinOp(
+                                    left=buffer_write_idx.rvalue(),
+                                    op=ast.Add(),
+                                    right=ast.Constant(value=1)
+                                )
+                            ),
+                            _skip()
                         ]
                     )
                 ]
@@ -965,5 +999,5 @@ class DirectCompiler(StreamOpVisitor):
             # self.register = update_val
             register_var.assign(ast.Constant(value=node.update_val)),
             # dst = DONE
-            self.dst.assign(ast.Name(id='DONE', ctx=ast.Load()))
+            self.dst.assign(_local('DONE'))
         ]
\ No newline at end of file
@@ -1,13 +1,12 @@
-"""Compiler for generating TypedBuffer construction code.
+"""Visitor for computing the event buffer size of a stream type.
 
-This module implements a visitor that walks stream types and generates
-AST expressions for constructing the appropriate TypedBuffer instances
-by recursively walking the type structure.
+This module implements a visitor that walks stream types and computes, at
+compile time, the maximum number of events a stream of that type can carry.
+The result is a plain int that the compilers fold into the generated code.
 """
 
 from __future__ import annotations
-from typing import TYPE_CHECKING
-import ast
+from typing import Dict, Set, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from yoink.typecheck.types import (
@@ -26,23 +25,37 @@ from yoink.compilation.streamtype_visitor import StreamTypeVisitor
 class EventBufferSize(StreamTypeVisitor):
     def __init__(self, ctx):
         super().__init__(ctx)
+        self.sizes: Dict[int, int] = {}  # id(ty) -> buffer size
+        self.following: Set[int] = set()  # ids of TypeVars whose links are being followed
 
-    def visit_TyEps(self, ty: 'TyEps'):
+    def visit(self, ty: 'Type') -> int:
+        """Compute the buffer size of ty, reusing the size of any type already visited."""
+        key = id(ty)
+        if key not in self.sizes:
+            self.sizes[key] = super().visit(ty)
+        return self.sizes[key]
+
+    def visit_TyEps(self, ty: 'TyEps') -> int:
         return 0
 
-    def visit_TyCat(self, ty: 'TyCat') -> ast.expr:
-        return self.visit(ty.left_type) +  self.visit(ty.right_type)
+    def visit_TyCat(self, ty: 'TyCat') -> int:
+        return self.visit(ty.left_type) + self.visit(ty.right_type)
 
-    def visit_TyPlus(self, ty: 'TyPlus') -> ast.expr:
-        return max(self.visit(ty.left_type),self.visit(ty.right_type))
+    def visit_TyPlus(self, ty: 'TyPlus') -> int:
+        return max(self.visit(ty.left_type), self.visit(ty.right_type))
 
-    def visit_TyStar(self, ty: 'TyStar') -> ast.expr:
+    def visit_TyStar(self, ty: 'TyStar') -> int:
         raise NotImplementedError("Typed buffers of star type are not supported")
-        
-    def visit_Singleton(self, ty: 'Singleton') -> ast.expr:
+
+    def visit_Singleton(self, ty: 'Singleton') -> int:
         return 1
 
-    def visit_TypeVar(self, ty: 'TypeVar') -> ast.expr:
-        """Follow type variable links and generate buffer for the linked type."""
+    def visit_TypeVar(self, ty: 'TypeVar') -> int:
+        """Follow type variable links and compute the size of the linked type."""
         assert ty.link is not None, f"TypeVar {ty.id} must be linked before compilation"
-        return self.visit(ty.link)
+        assert ty.id not in self.following, f"TypeVar {ty.id} links back to itself"
+        self.following.add(ty.id)
+        try:
+            return self.visit(ty.link)
+        finally:
+            self.following.discard(ty.id)
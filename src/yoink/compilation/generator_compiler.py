@@ -9,7 +9,7 @@ from __future__ import annotations
 from typing import List, Callable, TYPE_CHECKING
 import ast
 
-from yoink.compilation.streamop_visitor import StreamOpVisitor
+from yoink.compilation.streamop_visitor import StreamOpVisitor, has_kind, has_tag_kind
 from yoink.compilation import CompilationContext, StateVar
 
 if TYPE_CHECKING:
@@ -27,6 +27,34 @@ if TYPE_CHECKING:
     from yoink.stream_ops.recursive_section import RecursiveSection
 
 
+# Continuations of the top-level compiler: `return` ends the generator, `yield` emits a value
+_ROOT_DONE = [ast.Return(value=None)]
+
+
+def _root_yield(expr: ast.expr) -> List[ast.stmt]:
+    return [ast.Expr(value=ast.Yield(value=expr))]
+
+
+# __iter__ binds the globals that the generated loops reference per event to fast locals
+# through default arguments, as DirectCompiler does for __next__.
+ITER_LOCALS = {
+    'CatEvA': '_CatEvA',
+    'CAT_PUNC': '_CAT_PUNC',
+    'PLUS_PUNC_A': '_PLUS_PUNC_A',
+    'PLUS_PUNC_B': '_PLUS_PUNC_B',
+}
+
+
+# Leaf nodes repeated across the visitors are built once and shared; no pass mutates them.
+_LOCAL_NAMES = {name: ast.Name(id=local, ctx=ast.Load()) for name, local in ITER_LOCALS.items()}
+_NONE = ast.Constant(value=None)
+_TRUE = ast.Constant(value=True)
+_FALSE = ast.Constant(value=False)
+_SELF = ast.Name(id='self', ctx=ast.Load())
+_PASS = ast.Pass()
+_BREAK = ast.Break()
+
+
 class GeneratorCompiler(StreamOpVisitor):
     """Generator compilation: uses yield statements.
 
@@ -34,6 +62,8 @@ class GeneratorCompiler(StreamOpVisitor):
     Generates code that uses Python's generator features.
     """
 
+    __slots__ = ('done_cont', 'yield_cont')
+
     def __init__(self, ctx, done_cont: List[ast.stmt],
                  yield_cont: Callable[[ast.expr], List[ast.stmt]]):
         super().__init__(ctx)
@@ -50,27 +80,15 @@ class GeneratorCompiler(StreamOpVisitor):
         Returns:
             The compiled class (not an instance)
         """
+        from yoink.compilation.runtime import Runtime
+
         module_ast = GeneratorCompiler._generate_module_ast(dataflow_graph)
 
-        code = compile(module_ast, '<generated>', 'exec')
-
-        # Execute in namespace with event types and DONE
-        from yoink.stream_ops import DONE, CatRState
-        from yoink.event import BaseEvent, CatEvA, CatPunc, ParEvA, ParEvB, PlusPuncA, PlusPuncB
-        namespace = {
-            'DONE': DONE,
-            'BaseEvent': BaseEvent,
-            'CatEvA': CatEvA,
-            'CatPunc': CatPunc,
-            'ParEvA': ParEvA,
-            'ParEvB': ParEvB,
-            'PlusPuncA': PlusPuncA,
-            'PlusPuncB': PlusPuncB,
-            'CatRState': CatRState,
-        }
-        exec(code, namespace)
-
-        return namespace['FlattenedIterator']
+        # Generated code has no asserts or docstrings to keep, so compile at the top optimization level
+        code = compile(module_ast, '<generated>', 'exec', optimize=2)
+
+        runtime = Runtime()
+        return runtime.exec(code)
 
     @staticmethod
     def get_code(dataflow_graph) -> str:
@@ -95,22 +113,24 @@ class GeneratorCompiler(StreamOpVisitor):
         Returns:
             The module AST
         """
-        ctx = CompilationContext()
+        # A generator's state lives only for one run of __iter__, so it is kept in locals
+        ctx = CompilationContext(local_state=True)
 
         # Map input vars to their indices
         ctx.var_to_input_idx = {var.id: i for i, var in enumerate(dataflow_graph.input_vars)}
 
         # Compile the output node
-        done_cont = [ast.Return(value=None)]  # End the generator
-        yield_cont = lambda expr: [ast.Expr(value=ast.Yield(value=expr))]  # Yield values
-        compiler = GeneratorCompiler(ctx, done_cont, yield_cont)
-        output_stmts = dataflow_graph.outputs.accept(compiler)
+        compiler = GeneratorCompiler(ctx, _ROOT_DONE, _root_yield)
+        output_stmts = compiler.visit(dataflow_graph.outputs)
 
         # Generate the class AST
         class_ast = GeneratorCompiler._generate_class_ast(dataflow_graph, ctx, output_stmts)
 
-        # Create and return the module AST
-        module_ast = ast.Module(body=[class_ast], type_ignores=[])
+        # Create and return the module AST, building each singleton's event and the exception classes once at module level
+        module_ast = ast.Module(
+            body=ctx.singleton_event_defs() + GeneratorCompiler._generate_exception_defs(ctx) + [class_ast],
+            type_ignores=[]
+        )
         ast.fix_missing_locations(module_ast)
         return module_ast
 
@@ -118,6 +138,11 @@ class GeneratorCompiler(StreamOpVisitor):
     def _generate_class_ast(dataflow_graph, ctx: CompilationContext, output_stmts: List[ast.stmt]) -> ast.ClassDef:
         """Generate the complete FlattenedIterator class for generator compilation."""
         body = [
+            # The only per-instance state is the inputs; the state flags are locals of __iter__
+            ast.Assign(
+                targets=[ast.Name(id='__slots__', ctx=ast.Store())],
+                value=ast.Tuple(elts=[ast.Constant(value='inputs')], ctx=ast.Load())
+            ),
             GeneratorCompiler._generate_init(dataflow_graph, ctx),
             GeneratorCompiler._generate_iter(output_stmts, ctx),
             GeneratorCompiler._generate_reset(dataflow_graph, ctx),
@@ -137,9 +162,12 @@ class GeneratorCompiler(StreamOpVisitor):
 
         Generators don't need explicit state initialization like DirectCompiler/CPSCompiler.
         The generator's execution position IS the state.
+
+        Each input is stored as an iterator: one input may be looped over at several sites
+        (e.g. the head and tail loops of a CatProj), which must resume rather than restart it.
         """
         body: List[ast.stmt] = [
-            # self.inputs = list(input_iterators)
+            # self.inputs = list(map(iter, input_iterators))
             ast.Assign(
                 targets=[ast.Attribute(
                     value=ast.Name(id='self', ctx=ast.Load()),
@@ -148,7 +176,14 @@ class GeneratorCompiler(StreamOpVisitor):
                 )],
                 value=ast.Call(
                     func=ast.Name(id='list', ctx=ast.Load()),
-                    args=[ast.Name(id='input_iterators', ctx=ast.Load())],
+                    args=[ast.Call(
+                        func=ast.Name(id='map', ctx=ast.Load()),
+                        args=[
+                            ast.Name(id='iter', ctx=ast.Load()),
+                            ast.Name(id='input_iterators', ctx=ast.Load())
+                        ],
+                        keywords=[]
+                    )],
                     keywords=[]
                 )
             )
@@ -171,9 +206,12 @@ class GeneratorCompiler(StreamOpVisitor):
         )
 
     @staticmethod
-    def _generate_iter(output_stmts: List[ast.stmt], ctx: CompilationContext) -> ast.FunctionDef:
-        """Generate __iter__ method as a generator function."""
-        # Generate exception class definitions at the top of __iter__
+    def _generate_exception_defs(ctx: CompilationContext) -> List[ast.stmt]:
+        """Generate the escape and recurse exception classes.
+
+        These are defined once at module level, so starting an iteration does not build
+        new class objects.
+        """
         exception_defs = []
         for exc_name in ctx.escape_exceptions.values():
             exception_defs.append(
@@ -196,6 +234,34 @@ class GeneratorCompiler(StreamOpVisitor):
                 )
             )
 
+        return exception_defs
+
+    @staticmethod
+    def _generate_iter(output_stmts: List[ast.stmt], ctx: CompilationContext) -> ast.FunctionDef:
+        """Generate __iter__ method as a generator function.
+
+        The input iterators are unpacked into locals _in0, _in1, ... up front, since the
+        input index of every Var is known at compile time.
+        """
+        input_binds = []
+        if ctx.var_to_input_idx:
+            input_binds.append(
+                ast.Assign(
+                    targets=[ast.Tuple(
+                        elts=[ast.Name(id=f'_in{i}', ctx=ast.Store()) for i in range(len(ctx.var_to_input_idx))],
+                        ctx=ast.Store()
+                    )],
+                    value=ast.Attribute(
+                        value=ast.Name(id='self', ctx=ast.Load()),
+                        attr='inputs',
+                        ctx=ast.Load()
+                    )
+                )
+            )
+
+        # Bind only the __iter__-local aliases that the visitors emitted
+        aliased = [name for name in ITER_LOCALS if name in ctx.used_locals]
+
         # Generate state variable initializations
         state_inits = []
         for node_id, state_vars in ctx.state_vars.items():
@@ -207,18 +273,34 @@ class GeneratorCompiler(StreamOpVisitor):
                     )
                 )
 
+        # The state flags are locals of __iter__. A subgenerator declares nonlocal only the flags it
+        # sets, so flags it never touches stay fast locals of __iter__ rather than cell variables.
+        if state_inits:
+            state_names = [state_var.name for state_vars in ctx.state_vars.values() for state_var in state_vars.values()]
+            for subgenerator in ctx.subgenerators:
+                if isinstance(subgenerator.body[0], ast.Nonlocal):
+                    continue
+                assigned = {
+                    n.id for n in ast.walk(subgenerator)
+                    if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)
+                }
+                names = [name for name in state_names if name in assigned]
+                if names:
+                    subgenerator.body.insert(0, ast.Nonlocal(names=names))
+
         return ast.FunctionDef(
             name='__iter__',
             args=ast.arguments(
-                args=[ast.arg(arg='self', annotation=None)],
+                args=[ast.arg(arg='self', annotation=None)] +
+                     [ast.arg(arg=ITER_LOCALS[name], annotation=None) for name in aliased],
                 vararg=None,
                 kwonlyargs=[],
                 kw_defaults=[],
                 kwarg=None,
-                defaults=[],
+                defaults=[ast.Name(id=name, ctx=ast.Load()) for name in aliased],
                 posonlyargs=[]
             ),
-            body=exception_defs + state_inits + output_stmts,
+            body=input_binds + ctx.subgenerators + state_inits + output_stmts,
             decorator_list=[],
             returns=None,
         )
@@ -243,59 +325,50 @@ class GeneratorCompiler(StreamOpVisitor):
         )
 
     def visit_Var(self, node: 'Var') -> List[ast.stmt]:
-        """Generator version - loop through input iterator."""
-        input_idx = self.ctx.var_to_input_idx[node.id]
+        """Generator version - loop through input iterator.
 
-        tmp_var = self.ctx.allocate_temp()
+        Compiles to: for tmp in _in<idx>: if tmp is not None: yield_cont(tmp) else: done_cont
 
-        input_access = ast.Subscript(
-            value=ast.Attribute(
-                value=ast.Name(id='self', ctx=ast.Load()),
-                attr='inputs',
-                ctx=ast.Load()
-            ),
-            slice=ast.Constant(value=input_idx),
-            ctx=ast.Load()
-        )
+        The for loop leaves StopIteration handling to the interpreter. A None read from an
+        input is a tick without an event, so it is skipped.
+        """
+        tmp_var = self.ctx.allocate_temp()
 
         return [
-            ast.Try(
+            ast.For(
+                target=tmp_var.lvalue(),
+                iter=self._input_access(node),
                 body=[
-                    ast.While(
-                        test=ast.NamedExpr(
-                            target=ast.Name(id=tmp_var.name, ctx=ast.Store()),
-                            value=ast.Call(
-                                func=ast.Name(id='next', ctx=ast.Load()),
-                                args=[input_access],
-                                keywords=[]
-                            )
+                    ast.If(
+                        test=ast.Compare(
+                            left=tmp_var.rvalue(),
+                            ops=[ast.IsNot()],
+                            comparators=[_NONE]
                         ),
                         body=self.yield_cont(tmp_var.rvalue()),
                         orelse=[]
                     )
                 ],
-                handlers=[
-                    ast.ExceptHandler(
-                        type=ast.Name(id='StopIteration', ctx=ast.Load()),
-                        name=None,
-                        body=self.done_cont
-                    )
-                ],
-                orelse=[],
-                finalbody=[]
+                orelse=self.done_cont
             )
         ]
 
+    def _local(self, name: str) -> ast.Name:
+        """Load the __iter__-local alias of the global `name`, recording that __iter__ binds it."""
+        self.ctx.used_locals.add(name)
+        return _LOCAL_NAMES[name]
+
+    def _input_access(self, node: 'Var') -> ast.expr:
+        """_in<idx>: the local that __iter__ binds the Var's input iterator to."""
+        return ast.Name(id=f'_in{self.ctx.var_to_input_idx[node.id]}', ctx=ast.Load())
+
     def visit_Eps(self, node: 'Eps') -> List[ast.stmt]:
         return self.done_cont
 
     def visit_SingletonOp(self, node: 'SingletonOp') -> List[ast.stmt]:
         """Generator version - emit value once, no state needed."""
-        event_expr = ast.Call(
-            func=ast.Name(id='BaseEvent', ctx=ast.Load()),
-            args=[ast.Constant(value=node.value)],
-            keywords=[]
-        )
+        # The event is built once at module level, not on every firing
+        event_expr = ast.Name(id=self.ctx.singleton_event(node), ctx=ast.Load())
 
         return self.yield_cont(event_expr) + self.done_cont
 
@@ -310,7 +383,7 @@ class GeneratorCompiler(StreamOpVisitor):
                     reset_stmts.append(
                         ast.Assign(
                             targets=[state_var.lvalue()],
-                            value=ast.Constant(value=False)
+                            value=_FALSE
                         )
                     )
 
@@ -330,87 +403,116 @@ class GeneratorCompiler(StreamOpVisitor):
 
     def visit_SumInj(self, node: 'SumInj') -> List[ast.stmt]:
         """Generator version - emit tag, then delegate to input. No state needed!"""
-        tag_class = 'PlusPuncA' if node.position == 0 else 'PlusPuncB'
-
-        tag_event = ast.Call(
-            func=ast.Name(id=tag_class, ctx=ast.Load()),
-            args=[],
-            keywords=[]
-        )
+        tag_event = self._local('PLUS_PUNC_A' if node.position == 0 else 'PLUS_PUNC_B')
 
         tag_yield = self.yield_cont(tag_event)
 
         # Then compile input stream
-        input_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        input_stmts = node.input_stream.accept(input_compiler)
+        input_stmts = self.visit(node.input_stream)
 
         # Sequential: emit tag, then run input
         return tag_yield + input_stmts
 
     def visit_UnsafeCast(self, node: 'UnsafeCast') -> List[ast.stmt]:
         """Pass through to input stream."""
-        input_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        return node.input_stream.accept(input_compiler)
+        return self.visit(node.input_stream)
 
     def visit_CatR(self, node: 'CatR') -> List[ast.stmt]:
         def first_stream_yield_cont(val_expr):
             return self.yield_cont(
                 ast.Call(
-                    func=ast.Name(id='CatEvA', ctx=ast.Load()),
+                    func=self._local('CatEvA'),
                     args=[val_expr],
                     keywords=[]
                 )
             )
 
-        first_stream_done_cont = self.yield_cont(
-            ast.Call(
-                func=ast.Name(id='CatPunc', ctx=ast.Load()),
-                args=[],
-                keywords=[]
-            )
-        )
+        first_stream_done_cont = self.yield_cont(self._local('CAT_PUNC'))
 
         # Compile s1 - when done, yield CatPunc
         s1_compiler = GeneratorCompiler(self.ctx, first_stream_done_cont, first_stream_yield_cont)
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
         # Compile s2 - when done, propagate to parent's done_cont
-        s2_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         # Sequential execution: run s1, then s2
         return s1_stmts + s2_stmts
 
     def visit_CatProj(self, node: 'CatProj') -> List[ast.stmt]:
         """Compile CatProj with generators."""
+        from yoink.stream_ops.var import Var
+        from yoink.event import KIND_CATEVA, KIND_CATPUNC
+
         coord = node.coordinator
 
         if node.position == 0:
             # Position 0: extract CatEvA values until CatPunc
             # When we see CatPunc, set seen_punc, execute done_cont, and raise escape exception
-            escape_exc = self.ctx.escape_exception(coord)
             seen_punc_var = self.ctx.state_var(coord, 'seen_punc')
 
+            if isinstance(coord.input_stream, Var):
+                # Reading an input directly, the CatPunc is seen in the body of the input's own
+                # loop, so it can leave with break instead of raising the escape exception:
+                #   for tmp in input: if tmp is not None: <CatEvA: yield_cont> <CatPunc: seen_punc = True; break>
+                #   done_cont
+                # Both the break and exhausting the input fall through to done_cont.
+                event_var = self.ctx.allocate_temp()
+                read_head = ast.For(
+                    target=event_var.lvalue(),
+                    iter=self._input_access(coord.input_stream),
+                    body=[
+                        ast.If(
+                            test=ast.Compare(
+                                left=event_var.rvalue(),
+                                ops=[ast.IsNot()],
+                                comparators=[_NONE]
+                            ),
+                            body=[
+                                ast.If(
+                                    test=has_kind(event_var.rvalue(), KIND_CATEVA),
+                                    body=self.yield_cont(
+                                        ast.Attribute(value=event_var.rvalue(), attr='value', ctx=ast.Load())
+                                    ),
+                                    orelse=[
+                                        ast.If(
+                                            test=has_kind(event_var.rvalue(), KIND_CATPUNC),
+                                            body=[
+                                                seen_punc_var.assign(_TRUE),
+                                                _BREAK
+                                            ],
+                                            orelse=[]
+                                        )
+                                    ]
+                                )
+                            ],
+                            orelse=[]
+                        )
+                    ],
+                    orelse=[]
+                )
+                return [
+                    ast.If(
+                        test=seen_punc_var.rvalue(),
+                        body=self.done_cont,
+                        orelse=[read_head] + self.done_cont
+                    )
+                ]
+
+            escape_exc = self.ctx.escape_exception(coord)
+
             def input_yield_cont(event_expr):
                 return [
                     ast.If(
-                        test=ast.Call(
-                            func=ast.Name(id='isinstance', ctx=ast.Load()),
-                            args=[event_expr, ast.Name(id='CatEvA', ctx=ast.Load())],
-                            keywords=[]
-                        ),
+                        test=has_kind(event_expr, KIND_CATEVA),
                         body=self.yield_cont(
                             ast.Attribute(value=event_expr, attr='value', ctx=ast.Load())
                         ),
                         orelse=[
                             ast.If(
-                                test=ast.Call(
-                                    func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                    args=[event_expr, ast.Name(id='CatPunc', ctx=ast.Load())],
-                                    keywords=[]
-                                ),
+                                test=has_kind(event_expr, KIND_CATPUNC),
                                 body=[
-                                    seen_punc_var.assign(ast.Constant(value=True)),
+                                    seen_punc_var.assign(_TRUE),
                                     ast.Raise(
                                         exc=ast.Call(
                                             func=ast.Name(id=escape_exc, ctx=ast.Load()),
@@ -420,14 +522,14 @@ class GeneratorCompiler(StreamOpVisitor):
                                         cause=None
                                     )
                                 ],
-                                orelse=[ast.Pass()]
+                                orelse=[_PASS]
                             )
                         ]
                     )
                 ]
 
             input_compiler = GeneratorCompiler(self.ctx, self.done_cont, input_yield_cont)
-            input_stmts = coord.input_stream.accept(input_compiler)
+            input_stmts = input_compiler.visit(coord.input_stream)
 
             # Check seen_punc FIRST - if already true, immediately execute done_cont
             # Otherwise, wrap input processing in try/except to catch escape exception
@@ -457,6 +559,41 @@ class GeneratorCompiler(StreamOpVisitor):
             # Use the same seen_punc state var that position 0 sets
             seen_punc_var = self.ctx.state_var(coord, 'seen_punc')
 
+            if isinstance(coord.input_stream, Var):
+                # Reading an input directly, the two phases are two loops over its iterator:
+                #   for tmp in input: if tmp is not None and tmp.KIND == CATPUNC: seen_punc = True; break
+                #   <Var loop passing every tail event to yield_cont>
+                # so the tail is forwarded without a seen_punc test per event. If the head runs the
+                # input dry, the tail loop finds it exhausted and goes straight to done_cont.
+                event_var = self.ctx.allocate_temp()
+                skip_head = ast.For(
+                    target=event_var.lvalue(),
+                    iter=self._input_access(coord.input_stream),
+                    body=[
+                        ast.If(
+                            test=ast.BoolOp(
+                                op=ast.And(),
+                                values=[
+                                    ast.Compare(
+                                        left=event_var.rvalue(),
+                                        ops=[ast.IsNot()],
+                                        comparators=[_NONE]
+                                    ),
+                                    has_kind(event_var.rvalue(), KIND_CATPUNC)
+                                ]
+                            ),
+                            body=[
+                                seen_punc_var.assign(_TRUE),
+                                _BREAK
+                            ],
+                            orelse=[]
+                        )
+                    ],
+                    orelse=[]
+                )
+                tail_stmts = self.visit(coord.input_stream)
+                return [seen_punc_var.assign(_FALSE), skip_head] + tail_stmts
+
             def input_yield_cont(event_expr):
                 # Position 1: skip events until CatPunc, then pass through all tail events
                 return [
@@ -468,21 +605,13 @@ class GeneratorCompiler(StreamOpVisitor):
                         body=[
                             # Before punc: skip CatEvA and CatPunc
                             ast.If(
-                                test=ast.Call(
-                                    func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                    args=[event_expr, ast.Name(id='CatEvA', ctx=ast.Load())],
-                                    keywords=[]
-                                ),
-                                body=[ast.Pass()],  # Skip CatEvA
+                                test=has_kind(event_expr, KIND_CATEVA),
+                                body=[_PASS],  # Skip CatEvA
                                 orelse=[
                                     ast.If(
-                                        test=ast.Call(
-                                            func=ast.Name(id='isinstance', ctx=ast.Load()),
-                                            args=[event_expr, ast.Name(id='CatPunc', ctx=ast.Load())],
-                                            keywords=[]
-                                        ),
+                                        test=has_kind(event_expr, KIND_CATPUNC),
                                         body=[
-                                            seen_punc_var.assign(ast.Constant(value=True)),
+                                            seen_punc_var.assign(_TRUE),
                                             # ast.Pass()  # Skip the first CatPunc
                                         ],
                                         orelse=[]  # Skip everything else before punc
@@ -495,46 +624,44 @@ class GeneratorCompiler(StreamOpVisitor):
                 ]
 
             input_compiler = GeneratorCompiler(self.ctx, self.done_cont, input_yield_cont)
-            input_stmts = coord.input_stream.accept(input_compiler)
+            input_stmts = input_compiler.visit(coord.input_stream)
 
             # Initialize seen_punc before processing
-            return [seen_punc_var.assign(ast.Constant(value=False))] + input_stmts
+            return [seen_punc_var.assign(_FALSE)] + input_stmts
 
     def visit_CaseOp(self, node: 'CaseOp') -> List[ast.stmt]:
         """Compile CaseOp with generators."""
-        tag_var = self.ctx.allocate_temp()
-
-        branch0_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        branch0_stmts = node.branches[0].accept(branch0_compiler)
+        from yoink.event import KIND_PLUSPUNCA
 
-        branch1_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch0_stmts = list(self.visit(node.branches[0]))
+        branch1_stmts = list(self.visit(node.branches[1]))
+        yield_sites = 0
 
         def input_yield_cont(tag_expr):
+            nonlocal yield_sites
+            yield_sites += 1
             return [
                 ast.If(
-                    test=ast.Call(
-                        func=ast.Name(id='isinstance', ctx=ast.Load()),
-                        args=[tag_expr, ast.Name(id='PlusPuncA', ctx=ast.Load())],
-                        keywords=[]
-                    ),
+                    test=has_tag_kind(tag_expr, KIND_PLUSPUNCA),
                     body=branch0_stmts,
                     orelse=branch1_stmts
                 )
             ]
 
         input_compiler = GeneratorCompiler(self.ctx, self.done_cont, input_yield_cont)
-        return node.input_stream.accept(input_compiler)
+        input_stmts = input_compiler.visit(node.input_stream)
+        if yield_sites > 1:
+            self._outline_branches(branch0_stmts, branch1_stmts)
+        return input_stmts
 
     def visit_SinkThen(self, node: 'SinkThen') -> List[ast.stmt]:
         """Sink s1 (ignore all yields), then run s2."""
         # Sink s1 - ignore all values
-        s1_compiler = GeneratorCompiler(self.ctx, [ast.Pass()], lambda _: [ast.Pass()])
-        s1_stmts = node.input_streams[0].accept(s1_compiler)
+        s1_compiler = GeneratorCompiler(self.ctx, [_PASS], lambda _: [_PASS])
+        s1_stmts = s1_compiler.visit(node.input_streams[0])
 
         # Run s2 normally
-        s2_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-        s2_stmts = node.input_streams[1].accept(s2_compiler)
+        s2_stmts = self.visit(node.input_streams[1])
 
         return s1_stmts + s2_stmts
 
@@ -542,13 +669,13 @@ class GeneratorCompiler(StreamOpVisitor):
         """Compile CondOp with generators."""
         cond_var = self.ctx.allocate_temp()
 
-        def cond_yield_cont(cond_expr):
-            branch0_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-            branch0_stmts = node.branches[0].accept(branch0_compiler)
-
-            branch1_compiler = GeneratorCompiler(self.ctx, self.done_cont, self.yield_cont)
-            branch1_stmts = node.branches[1].accept(branch1_compiler)
+        branch0_stmts = list(self.visit(node.branches[0]))
+        branch1_stmts = list(self.visit(node.branches[1]))
+        yield_sites = 0
 
+        def cond_yield_cont(cond_expr):
+            nonlocal yield_sites
+            yield_sites += 1
             return [
                 cond_var.assign(cond_expr),
                 ast.If(
@@ -563,7 +690,50 @@ class GeneratorCompiler(StreamOpVisitor):
         # that looks like the CPS compiler code!
         # It pulls *one* event out and then continues to run.
         cond_compiler = GeneratorCompiler(self.ctx, self.done_cont, cond_yield_cont)
-        return node.cond_stream.accept(cond_compiler)
+        cond_stmts = cond_compiler.visit(node.cond_stream)
+        if yield_sites > 1:
+            self._outline_branches(branch0_stmts, branch1_stmts)
+        return cond_stmts
+
+    def _outline_branches(self, *branches: List[ast.stmt]) -> None:
+        """Replace branch code that is inlined at several yield sites with a call to a subgenerator.
+
+        Each branch is moved into its own generator function, defined once at the top of __iter__,
+        and every site runs `yield from _sub_k(self); return` instead of a full copy of the branch.
+        This is only equivalent when the branches end the whole generator, so it is done only under
+        the top-level continuations. Branches are edited in place, as the sites share the lists.
+        """
+        if self.done_cont is not _ROOT_DONE or self.yield_cont is not _root_yield:
+            return
+        for stmts in branches:
+            if not any(isinstance(n, ast.Yield) for stmt in stmts for n in ast.walk(stmt)):
+                continue  # Emits nothing, so there is nothing to delegate to a generator
+            name = f'_sub_{len(self.ctx.subgenerators)}'
+            self.ctx.subgenerators.append(
+                ast.FunctionDef(
+                    name=name,
+                    args=ast.arguments(
+                        args=[ast.arg(arg='self', annotation=None)],
+                        vararg=None,
+                        kwonlyargs=[],
+                        kw_defaults=[],
+                        kwarg=None,
+                        defaults=[],
+                        posonlyargs=[]
+                    ),
+                    body=list(stmts),
+                    decorator_list=[],
+                    returns=None,
+                )
+            )
+            stmts[:] = [
+                ast.Expr(value=ast.YieldFrom(value=ast.Call(
+                    func=ast.Name(id=name, ctx=ast.Load()),
+                    args=[_SELF],
+                    keywords=[]
+                ))),
+                ast.Return(value=None)
+            ]
 
     def visit_RecursiveSection(self, node: 'RecursiveSection') -> List[ast.stmt]:
         """Wrap the block contents in a nested try/while/try structure for reset control.
@@ -595,14 +765,14 @@ class GeneratorCompiler(StreamOpVisitor):
             )
         ]
         block_compiler = GeneratorCompiler(self.ctx, block_done_cont, self.yield_cont)
-        block_stmts = node.block_contents.accept(block_compiler)
+        block_stmts = block_compiler.visit(node.block_contents)
 
         # Nested structure: outer try catches escape, inner try catches recurse
         return [
             ast.Try(
                 body=[
                     ast.While(
-                        test=ast.Constant(value=True),
+                        test=_TRUE,
                         body=[
                             ast.Try(
                                 body=block_stmts,
@@ -1,14 +1,20 @@
 from yoink.stream_ops import DONE, CatRState
-from yoink.event import BaseEvent, CatEvA, CatPunc, ParEvA, ParEvB, PlusPuncA, PlusPuncB
+from yoink.event import BaseEvent, CatEvA, CatPunc, ParEvA, ParEvB, PlusPuncA, PlusPuncB, CAT_PUNC, PLUS_PUNC_A, PLUS_PUNC_B
 from yoink.stream_ops.typed_buffer import CatTypedBuffer, EpsTypedBuffer, PlusTypedBuffer, SingletonTypedBuffer,  make_typed_buffer
 from yoink.typecheck.types import Singleton, TyCat, TyEps, TyPlus, TyStar, Type, TypeVar
 
-class Runtime:
+def _bad_tag(tag):
+    raise RuntimeError(f"Expected PlusPuncA or PlusPuncB tag, got {tag}")
 
-    def __init__(self):
+# Names that generated modules run against. Built once on first use (EmitOpPhase cannot be
+# imported at module load) and copied into a fresh namespace for each module that is exec'd.
+_BASE_NS = {}
+
+def _base_namespace():
+    if not _BASE_NS:
         from yoink.stream_ops.emitop import EmitOpPhase
 
-        self.namespace =  {
+        _BASE_NS.update({
             'DONE': DONE,
             'BaseEvent': BaseEvent,
             'CatEvA': CatEvA,
@@ -17,10 +23,32 @@ class Runtime:
             'ParEvB': ParEvB,
             'PlusPuncA': PlusPuncA,
             'PlusPuncB': PlusPuncB,
+            'CAT_PUNC': CAT_PUNC,
+            'PLUS_PUNC_A': PLUS_PUNC_A,
+            'PLUS_PUNC_B': PLUS_PUNC_B,
             'CatRState': CatRState,
             'EmitOpPhase': EmitOpPhase,
-        }
+            '_bad_tag': _bad_tag,
+        })
+    return _BASE_NS
+
+class Runtime:
+
+    def __init__(self):
+        self.namespace = _base_namespace().copy()
     
+    # code object -> class it defines, shared by all runtimes. Code objects compare by
+    # their bytecode, constants and names, so an equal module builds an equivalent class.
+    compiled_classes = {}
+    max_compiled_classes = 256
+
     def exec(self,code):
-        exec(code,self.namespace)
-        return self.namespace['FlattenedIterator']
+        compiled = Runtime.compiled_classes.get(code)
+        if compiled is None:
+            exec(code,self.namespace)
+            compiled = self.namespace['FlattenedIterator']
+            if len(Runtime.compiled_classes) >= Runtime.max_compiled_classes:
+                # Drop the oldest entry
+                del Runtime.compiled_classes[next(iter(Runtime.compiled_classes))]
+            Runtime.compiled_classes[code] = compiled
+        return compiled
@@ -4,6 +4,8 @@ from __future__ import annotations
 from typing import List, TYPE_CHECKING
 import ast
 
+from yoink.compilation.streamop_visitor import DispatchByType
+
 if TYPE_CHECKING:
     from yoink.stream_ops.var import Var
     from yoink.stream_ops.catr import CatR
@@ -22,7 +24,12 @@ if TYPE_CHECKING:
     from yoink.compilation import CompilationContext
 
 
-class StreamOpResetCompiler:
+# Returned by every node that has no state to reset. Shared rather than allocated per
+# visit; compile_all only reads the lists the visitors return.
+_NO_RESET: List[ast.stmt] = []
+
+
+class StreamOpResetCompiler(DispatchByType):
     """Visitor for generating reset statements."""
 
     def __init__(self, ctx: 'CompilationContext'):
@@ -33,24 +40,52 @@ class StreamOpResetCompiler:
         """Dispatch to the appropriate visit method based on node type."""
         node_id = id(node)
         if node_id in self._visited:
-            return []
+            return _NO_RESET
         self._visited.add(node_id)
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
+        return super().visit(node)
     
     def compile_all(self, nodes):
         body = []
         for node in nodes:
             body.extend(self.visit(node))
+        body = self._fuse_constant_assigns(body)
         if body == []:
             body = [ast.Pass()]
         return body
 
+    @staticmethod
+    def _fuse_constant_assigns(stmts: List[ast.stmt]) -> List[ast.stmt]:
+        """Merge each run of `x = <const>` resets into one `x, y, ... = <const>, <const>, ...`.
+
+        CPython folds the right-hand tuple into a single constant, so the run costs one
+        constant load and an unpack instead of a load per target.
+        """
+        fused: List[ast.stmt] = []
+        run: List[ast.Assign] = []
+
+        def flush():
+            if len(run) > 1:
+                fused.append(ast.Assign(
+                    targets=[ast.Tuple(elts=[stmt.targets[0] for stmt in run], ctx=ast.Store())],
+                    value=ast.Tuple(elts=[stmt.value for stmt in run], ctx=ast.Load())
+                ))
+            else:
+                fused.extend(run)
+            run.clear()
+
+        for stmt in stmts:
+            if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.value, ast.Constant):
+                run.append(stmt)
+            else:
+                flush()
+                fused.append(stmt)
+        flush()
+        return fused
+
     def generic_visit(self, node) -> List[ast.stmt]:
         """Called if no explicit visitor method exists for a node."""
         # Most nodes don't need reset
-        return []
+        return _NO_RESET
 
     def visit_SingletonOp(self, node: 'SingletonOp') -> List[ast.stmt]:
         """Reset exhausted to False."""
@@ -64,17 +99,14 @@ class StreamOpResetCompiler:
         return [state_var.assign(ast.Constant(value=CatRState.FIRST_STREAM.value))]
 
     def visit_CatProjCoordinator(self, node: 'CatProjCoordinator') -> List[ast.stmt]:
-        """Reset coordinator state."""
-        seen_punc_var = self.ctx.state_var(node, 'seen_punc')
-        input_exhausted_var = self.ctx.state_var(node, 'input_exhausted')
-        return [
-            seen_punc_var.assign(ast.Constant(value=False)),
-            input_exhausted_var.assign(ast.Constant(value=False))
-        ]
+        """Reset coordinator phase to BEFORE_PUNC."""
+        from yoink.stream_ops.catproj import CatProjPhase
+        phase_var = self.ctx.state_var(node, 'phase')
+        return [phase_var.assign(ast.Constant(value=CatProjPhase.BEFORE_PUNC.value))]
 
     def visit_CatProj(self, node: 'CatProj') -> List[ast.stmt]:
         """CatProj has no state of its own; coordinator is visited separately."""
-        return []
+        return _NO_RESET
 
     def visit_SumInj(self, node: 'SumInj') -> List[ast.stmt]:
         """Reset tag_emitted to False."""
@@ -82,13 +114,9 @@ class StreamOpResetCompiler:
         return [tag_var.assign(ast.Constant(value=False))]
 
     def visit_CaseOp(self, node: 'CaseOp') -> List[ast.stmt]:
-        """Reset tag_read and active_branch."""
-        tag_read_var = self.ctx.state_var(node, 'tag_read')
+        """Reset active_branch to -1 (tag not read yet)."""
         active_branch_var = self.ctx.state_var(node, 'active_branch')
-        return [
-            tag_read_var.assign(ast.Constant(value=False)),
-            active_branch_var.assign(ast.Constant(value=-1))
-        ]
+        return [active_branch_var.assign(ast.Constant(value=-1))]
 
     def visit_SinkThen(self, node: 'SinkThen') -> List[ast.stmt]:
         """Reset first_exhausted."""
@@ -102,19 +130,19 @@ class StreamOpResetCompiler:
 
     # Nodes that don't need reset
     def visit_Var(self, node: 'Var') -> List[ast.stmt]:
-        return []
+        return _NO_RESET
 
     def visit_Eps(self, node: 'Eps') -> List[ast.stmt]:
-        return []
+        return _NO_RESET
 
     def visit_RecCall(self, node: 'RecCall') -> List[ast.stmt]:
-        return []
+        return _NO_RESET
 
     def visit_UnsafeCast(self, node: 'UnsafeCast') -> List[ast.stmt]:
-        return []
+        return _NO_RESET
 
     def visit_RecursiveSection(self, node: 'RecursiveSection') -> List[ast.stmt]:
-        return []
+        return _NO_RESET
 
     def visit_EmitOp(self, node: 'EmitOp') -> List[ast.stmt]:
         """Reset EmitOp phase and counters, and initialize all BufferOp out_bufs."""
@@ -5,7 +5,7 @@ Each compilation strategy (direct, CPS, generator) is implemented as a concrete
 """
 
 from __future__ import annotations
-from typing import List, TYPE_CHECKING
+from typing import Callable, Dict, List, TYPE_CHECKING
 import ast
 
 if TYPE_CHECKING:
@@ -28,13 +28,95 @@ if TYPE_CHECKING:
     from yoink.compilation import CompilationContext, StateVar
 
 
-class StreamOpVisitor:
+def has_kind(event: ast.expr, kind: int) -> ast.expr:
+    """event.KIND == kind
+
+    Generated code tells events apart by their integer KIND tag (see yoink.event), which
+    is a single attribute load and compare rather than an isinstance call.
+    """
+    return ast.Compare(
+        left=ast.Attribute(value=event, attr='KIND', ctx=ast.Load()),
+        ops=[ast.Eq()],
+        comparators=[ast.Constant(value=kind)]
+    )
+
+
+def has_tag_kind(tag: ast.expr, kind: int) -> ast.expr:
+    """getattr(tag, 'KIND', None) == kind
+
+    For the tag a CaseOp routes on, which may be a value that is not an event at all. Such a
+    tag matches no kind and reaches bad_tag instead of raising AttributeError. A tag is read
+    once per CaseOp activation, so the getattr stays off the per-event path.
+    """
+    return ast.Compare(
+        left=ast.Call(
+            func=ast.Name(id='getattr', ctx=ast.Load()),
+            args=[tag, ast.Constant(value='KIND'), ast.Constant(value=None)],
+            keywords=[]
+        ),
+        ops=[ast.Eq()],
+        comparators=[ast.Constant(value=kind)]
+    )
+
+
+def bad_tag(event: ast.expr) -> ast.stmt:
+    """_bad_tag(event)
+
+    The never-taken guard for a CaseOp tag that is neither PlusPuncA nor PlusPuncB. The
+    error message is formatted by the runtime helper, keeping it out of the hot code.
+    """
+    return ast.Expr(
+        value=ast.Call(
+            func=ast.Name(id='_bad_tag', ctx=ast.Load()),
+            args=[event],
+            keywords=[]
+        )
+    )
+
+
+class DispatchByType:
+    """Mixin for visitors that dispatch on a node's class to its `visit_<ClassName>` method.
+
+    The method is looked up by name once per node type and kept in a dispatch table owned
+    by each visitor class, so a subclass that overrides a visit method never sees its
+    parent's entry.
+    """
+
+    # node type -> visit function, filled in lazily for each concrete visitor class
+    _dispatch: Dict[type, Callable] = {}
+
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    def visit(self, node):
+        """Dispatch to the appropriate visit method based on node type."""
+        node_type = type(node)
+        try:
+            visitor = self._dispatch[node_type]
+        except KeyError:
+            visitor = getattr(type(self), f'visit_{node_type.__name__}', type(self).generic_visit)
+            self._dispatch[node_type] = visitor
+        return visitor(self, node)
+
+    def generic_visit(self, node):
+        """Called if no explicit visitor method exists for a node."""
+        raise NotImplementedError(
+            f"{self.__class__.__name__} has no visit method for {node.__class__.__name__}"
+        )
+
+
+class StreamOpVisitor(DispatchByType):
     """Base visitor for compiling StreamOps to AST statements.
 
     Each compilation strategy (direct, CPS, generator) extends this class
     and implements visit methods for each StreamOp type.
     """
 
+    __slots__ = ('ctx',)
+
     def __init__(self, ctx: 'CompilationContext'):
         self.ctx = ctx
 
@@ -62,18 +144,6 @@ class StreamOpVisitor:
         """
         raise NotImplementedError
 
-    def visit(self, node: 'StreamOp') -> List[ast.stmt]:
-        """Dispatch to the appropriate visit method based on node type."""
-        method_name = f'visit_{node.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(node)
-
-    def generic_visit(self, node: 'StreamOp') -> List[ast.stmt]:
-        """Called if no explicit visitor method exists for a node."""
-        raise NotImplementedError(
-            f"{self.__class__.__name__} has no visit method for {node.__class__.__name__}"
-        )
-
     # Visit methods for each StreamOp type
     # These are abstract and must be implemented by concrete visitors
 
@@ -7,6 +7,8 @@ Each compilation strategy can implement this visitor to handle different type co
 from __future__ import annotations
 from typing import TYPE_CHECKING
 
+from yoink.compilation.streamop_visitor import DispatchByType
+
 if TYPE_CHECKING:
     from yoink.typecheck.types import (
         Type,
@@ -20,7 +22,7 @@ if TYPE_CHECKING:
     from yoink.compilation import CompilationContext
 
 
-class StreamTypeVisitor:
+class StreamTypeVisitor(DispatchByType):
     """Base visitor for compiling stream Types.
 
     This visitor handles the different type constructors in the stream type system,
@@ -31,18 +33,6 @@ class StreamTypeVisitor:
     def __init__(self, ctx: 'CompilationContext'):
         self.ctx = ctx
 
-    def visit(self, ty: 'Type'):
-        """Dispatch to the appropriate visit method based on type constructor."""
-        method_name = f'visit_{ty.__class__.__name__}'
-        visitor = getattr(self, method_name, self.generic_visit)
-        return visitor(ty)
-
-    def generic_visit(self, ty: 'Type'):
-        """Called if no explicit visitor method exists for a ty."""
-        raise NotImplementedError(
-            f"{self.__class__.__name__} has no visit method for {ty.__class__.__name__}"
-        )
-
     def visit_TyEps(self, ty: 'TyEps'):
         """Visit empty stream type."""
         raise NotImplementedError
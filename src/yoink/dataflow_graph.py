@@ -23,6 +23,8 @@ class DataflowGraph:
         self.outputs = outputs
         self.original_func = original_func
         self.input_types = input_types
+        self.compiled_classes = {}  # compiler -> compiled class
+        self._run = None  # run specialized to this graph, built on first run once tracing is done
 
     def __call__(self, *args):
         """
@@ -56,21 +58,59 @@ class DataflowGraph:
         if len(iterators) != len(self.input_vars):
             raise ValueError(f"Expected {len(self.input_vars)} iterators, got {len(iterators)}")
 
+        run = self._run
+        if run is None:
+            run = self._run = self._build_run()
+        return run(*iterators)
+
+    def _build_run(self):
+        """Build a straight-line function that resets every node, binds the inputs and returns the outputs.
+
+        Nodes, vars and outputs are bound as globals of the generated function, so a call does
+        no loops and no attribute lookups beyond the reset methods and var sources themselves.
+        """
+        namespace = {}
+        body = []
+
         # Reset all nodes to initial state
-        for node in self.nodes:
-            node.reset()
+        for i, node in enumerate(self.nodes):
+            name = f'_reset{i}'
+            namespace[name] = node.reset
+            body.append(ast.Expr(value=ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=[], keywords=[])))
 
         # Bind concrete iterators to Var sources
-        for var, iterator in zip(self.input_vars, iterators):
-            var.source = iterator
+        args = []
+        for i, var in enumerate(self.input_vars):
+            name = f'_var{i}'
+            namespace[name] = var
+            args.append(ast.arg(arg=f'it{i}'))
+            body.append(ast.Assign(
+                targets=[ast.Attribute(value=ast.Name(id=name, ctx=ast.Load()), attr='source', ctx=ast.Store())],
+                value=ast.Name(id=f'it{i}', ctx=ast.Load())
+            ))
 
         # Return the output stream(s)
-        if isinstance(self.outputs,tuple):
-            for output in self.outputs:
-                output.ensure_legal_recursion(is_in_tail=True)
-        else:
-            self.outputs.ensure_legal_recursion(is_in_tail=True)
-        return self.outputs
+        outputs = self.outputs if isinstance(self.outputs, tuple) else (self.outputs,)
+        for i, output in enumerate(outputs):
+            name = f'_check{i}'
+            namespace[name] = output.ensure_legal_recursion
+            body.append(ast.Expr(value=ast.Call(
+                func=ast.Name(id=name, ctx=ast.Load()),
+                args=[],
+                keywords=[ast.keyword(arg='is_in_tail', value=ast.Constant(value=True))]
+            )))
+        namespace['_outputs'] = self.outputs
+        body.append(ast.Return(value=ast.Name(id='_outputs', ctx=ast.Load())))
+
+        func_def = ast.FunctionDef(
+            name='_run',
+            args=ast.arguments(posonlyargs=[], args=args, kwonlyargs=[], kw_defaults=[], defaults=[]),
+            body=body,
+            decorator_list=[]
+        )
+        module = ast.fix_missing_locations(ast.Module(body=[func_def], type_ignores=[]))
+        exec(compile(module, '<dataflow_graph_run>', 'exec', optimize=2), namespace)
+        return namespace['_run']
 
     def to_graphviz(self):
         from yoink.util.viz_builder import VizBuilder
@@ -81,10 +121,19 @@ class DataflowGraph:
         return VizBuilder(self).save(filename)
 
     def compile(self, compiler) -> type:
+        """Compile the graph with the given compiler, reusing the class from an earlier compile.
+
+        The graph does not change after tracing and the compiled classes keep all run state on
+        their instances, so each compiler's class is built once per graph.
+        """
         if isinstance(self.outputs, tuple):
             raise NotImplementedError("Compilation of tuple outputs not yet supported")
 
-        return compiler.compile(self)
+        compiled = self.compiled_classes.get(compiler)
+        if compiled is None:
+            compiled = compiler.compile(self)
+            self.compiled_classes[compiler] = compiled
+        return compiled
 
     def get_code(self, compiler) -> str:
         if isinstance(self.outputs, tuple):
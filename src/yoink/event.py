@@ -2,8 +2,19 @@
 
 from yoink.typecheck.has_type import has_type
 
+# Integer kind tags. Every event class carries one as KIND, so compiled code can
+# dispatch on `event.KIND == KIND_X` instead of a chain of isinstance checks.
+KIND_CATEVA = 0
+KIND_CATPUNC = 1
+KIND_PAREVA = 2
+KIND_PAREVB = 3
+KIND_PLUSPUNCA = 4
+KIND_PLUSPUNCB = 5
+KIND_BASE = 6
+
 class Event:
     """Base class for all event wrappers. Ensures all events implement has_type."""
+    __slots__ = ()
 
     def has_type(self, type):
         return has_type(self, type)
@@ -11,6 +22,9 @@ class Event:
 
 class CatEvA(Event):
     """Event from left side of concatenation."""
+    __slots__ = ('value',)
+    KIND = KIND_CATEVA
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
@@ -20,6 +34,9 @@ class CatEvA(Event):
 
 class CatPunc(Event):
     """Punctuation marker between A and B in concatenation."""
+    __slots__ = ()
+    KIND = KIND_CATPUNC
+
     def __repr__(self):
         return "CatPunc"
     def __eq__(self, other):
@@ -27,6 +44,9 @@ class CatPunc(Event):
 
 class ParEvA(Event):
     """Event from left side of parallel composition."""
+    __slots__ = ('value',)
+    KIND = KIND_PAREVA
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
@@ -36,6 +56,9 @@ class ParEvA(Event):
 
 class ParEvB(Event):
     """Event from right side of parallel composition."""
+    __slots__ = ('value',)
+    KIND = KIND_PAREVB
+
     def __init__(self, value):
         self.value = value
     def __repr__(self):
@@ -45,6 +68,9 @@ class ParEvB(Event):
 
 class PlusPuncA(Event):
     """Tag marker for left injection in sum types."""
+    __slots__ = ()
+    KIND = KIND_PLUSPUNCA
+
     def __repr__(self):
         return "PlusPuncA"
     def __eq__(self, other):
@@ -52,13 +78,26 @@ class PlusPuncA(Event):
 
 class PlusPuncB(Event):
     """Tag marker for right injection in sum types."""
+    __slots__ = ()
+    KIND = KIND_PLUSPUNCB
+
     def __repr__(self):
         return "PlusPuncB"
     def __eq__(self, other):
         return isinstance(other, PlusPuncB)
 
 
+# The tag events carry no value, so generated code shares one instance of each
+# rather than constructing a new one per emission.
+CAT_PUNC = CatPunc()
+PLUS_PUNC_A = PlusPuncA()
+PLUS_PUNC_B = PlusPuncB()
+
+
 class BaseEvent(Event):
+    __slots__ = ('value',)
+    KIND = KIND_BASE
+
     def __init__(self, value):
         self.value = value
 
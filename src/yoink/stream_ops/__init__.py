@@ -4,7 +4,7 @@ from yoink.stream_ops.base import DONE, Done, StreamOp
 from yoink.stream_ops.var import Var
 from yoink.stream_ops.eps import Eps
 from yoink.stream_ops.catr import CatR, CatRState
-from yoink.stream_ops.catproj import CatProj, CatProjCoordinator
+from yoink.stream_ops.catproj import CatProj, CatProjCoordinator, CatProjPhase
 from yoink.stream_ops.suminj import SumInj
 from yoink.stream_ops.caseop import CaseOp
 from yoink.stream_ops.sinkthen import SinkThen
@@ -29,6 +29,7 @@ __all__ = [
     'CatR',
     'CatProj',
     'CatProjCoordinator',
+    'CatProjPhase',
     'SumInj',
     'CaseOp',
     'SinkThen',
@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 from typing import List
+from enum import Enum
 
 
 from yoink.stream_ops.base import StreamOp, DONE
 from yoink.event import CatEvA, CatPunc, PlusPuncA, PlusPuncB
 
 
+class CatProjPhase(Enum):
+    """Coordinator state used by compiled code, folding seen_punc and input_exhausted into one value."""
+    BEFORE_PUNC = 0  # Still reading the first component
+    AFTER_PUNC = 1   # CatPunc seen, reading the second component
+    EXHAUSTED = 2    # Input stream is done
+
+
 class CatProjCoordinator(StreamOp):
     """Coordinator for catl that manages shared state between two CatProj instances."""
     def __init__(self, input_stream, stream_type):
@@ -7,7 +7,7 @@ import ast
 from enum import Enum
 
 from yoink.stream_ops.base import StreamOp, DONE
-from yoink.event import CatEvA, CatPunc
+from yoink.event import CAT_PUNC, CatEvA
 
 class CatRState(Enum):
     """State machine for CatR operation."""
@@ -34,7 +34,7 @@ class CatR(StreamOp):
             val = self.input_streams[0]._pull()
             if val is DONE:
                 self.current_state = CatRState.SECOND_STREAM
-                return CatPunc()
+                return CAT_PUNC
             if val is None:
                 return None
             return CatEvA(val)
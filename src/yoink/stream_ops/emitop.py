@@ -1,46 +1,59 @@
 from yoink.stream_ops.base import StreamOp, DONE
 from yoink.typecheck.types import Type, Singleton, TyCat, TyPlus, TyStar, TyEps, TypeVar
-from yoink.event import BaseEvent, CatEvA, CatPunc, PlusPuncA, PlusPuncB
+from yoink.event import BaseEvent, CatEvA, CAT_PUNC, PLUS_PUNC_A, PLUS_PUNC_B
 from enum import Enum
 
 def value_to_events(value, stream_type : Type):
-    if isinstance(stream_type, TypeVar):
-        assert stream_type.link is not None
-        return value_to_events(value,stream_type.link)
-
-    elif isinstance(stream_type, TyEps):
-        return []
-
-    elif isinstance(stream_type, Singleton):
-        return [BaseEvent(value)]
-
-    elif isinstance(stream_type, TyCat):
-        left_val, right_val = value
-        left_events = value_to_events(left_val, stream_type.left_type)
-        right_events = value_to_events(right_val, stream_type.right_type)
-        # Wrap left events in CatEvA, add CatPunc, then right events
-        return [CatEvA(e) for e in left_events] + [CatPunc()] + right_events
-
-    elif isinstance(stream_type, TyPlus):
-        tag, tagged_val = value
-        if tag == 'left':
-            tagged_events = value_to_events(tagged_val, stream_type.left_type)
-            return [PlusPuncA()] + tagged_events
-        else:
-            tagged_events = value_to_events(tagged_val, stream_type.right_type)
-            return [PlusPuncB()] + tagged_events
+    # Work list of (value, type, depth): emit the events of value, each wrapped in depth CatEvAs.
+    # An entry with type None emits value itself, which is an already built event.
+    events = []
+    stack = [(value, stream_type, 0)]
+    while stack:
+        value, stream_type, depth = stack.pop()
+
+        while isinstance(stream_type, TypeVar):
+            assert stream_type.link is not None
+            stream_type = stream_type.link
+
+        if stream_type is None:
+            for _ in range(depth):
+                value = CatEvA(value)
+            events.append(value)
+
+        elif isinstance(stream_type, TyEps):
+            pass
+
+        elif isinstance(stream_type, Singleton):
+            stack.append((BaseEvent(value), None, depth))
+
+        elif isinstance(stream_type, TyCat):
+            left_val, right_val = value
+            # Left events wrapped in CatEvA, then CatPunc, then right events (pushed in reverse)
+            stack.append((right_val, stream_type.right_type, depth))
+            stack.append((CAT_PUNC, None, depth))
+            stack.append((left_val, stream_type.left_type, depth + 1))
+
+        elif isinstance(stream_type, TyPlus):
+            tag, tagged_val = value
+            if tag == 'left':
+                stack.append((tagged_val, stream_type.left_type, depth))
+                stack.append((PLUS_PUNC_A, None, depth))
+            else:
+                stack.append((tagged_val, stream_type.right_type, depth))
+                stack.append((PLUS_PUNC_B, None, depth))
+
+        elif isinstance(stream_type, TyStar):
+            # value is a list: PlusPuncB, CatEvA-wrapped element, CatPunc for each element, then PlusPuncA (nil)
+            stack.append((PLUS_PUNC_A, None, depth))
+            for element in reversed(value):
+                stack.append((CAT_PUNC, None, depth))
+                stack.append((element, stream_type.element_type, depth + 1))
+                stack.append((PLUS_PUNC_B, None, depth))
 
-    elif isinstance(stream_type, TyStar):
-        # value is a list
-        if len(value) == 0:
-            return [PlusPuncA()]  # nil
         else:
-            first_events = value_to_events(value[0], stream_type.element_type)
-            rest_events = value_to_events(value[1:], stream_type)  # Recursive call with TyStar
-            return [PlusPuncB()] + [CatEvA(e) for e in first_events] + [CatPunc()] + rest_events
+            raise ValueError(f"Unknown stream type: {stream_type}")
 
-    else:
-        raise ValueError(f"Unknown stream type: {stream_type}")
+    return events
 
 
 
@@ -6,7 +6,7 @@ from typing import List
 import ast
 
 from yoink.stream_ops.base import StreamOp, DONE
-from yoink.event import PlusPuncA, PlusPuncB
+from yoink.event import PLUS_PUNC_A, PLUS_PUNC_B
 
 
 class SumInj(StreamOp):
@@ -29,7 +29,7 @@ class SumInj(StreamOp):
         """Emit tag first (PlusPuncA if position=0, PlusPuncB if position=1), then pull from input stream."""
         if not self.tag_emitted:
             self.tag_emitted = True
-            return PlusPuncA() if self.position == 0 else PlusPuncB()
+            return PLUS_PUNC_A if self.position == 0 else PLUS_PUNC_B
         return self.input_stream._pull()
 
     def reset(self):
@@ -159,22 +159,31 @@ class PlusTypedBuffer(TypedBuffer):
 #         return self.elements
 
 
-def make_typed_buffer(stream_type):
-    """Factory function to create the appropriate TypedBuffer subclass for a stream type."""
+def typed_buffer_factory(stream_type):
+    """Walk stream_type once and return a function that builds a fresh TypedBuffer for it.
+
+    Use this where buffers for the same type are made repeatedly (e.g. on every reset),
+    so the type is not traversed again each time.
+    """
     if isinstance(stream_type, TypeVar):
         assert stream_type.link is not None
-        return make_typed_buffer(stream_type.link)
+        return typed_buffer_factory(stream_type.link)
     if isinstance(stream_type, Singleton):
-        return SingletonTypedBuffer()
+        return SingletonTypedBuffer
     elif isinstance(stream_type, TyCat):
-        left_buf = make_typed_buffer(stream_type.left_type)
-        right_buf = make_typed_buffer(stream_type.right_type)
-        return CatTypedBuffer(left_buf,right_buf)
+        make_left = typed_buffer_factory(stream_type.left_type)
+        make_right = typed_buffer_factory(stream_type.right_type)
+        return lambda: CatTypedBuffer(make_left(), make_right())
     elif isinstance(stream_type, TyPlus):
-        left_buf = make_typed_buffer(stream_type.left_type)
-        right_buf = make_typed_buffer(stream_type.right_type)
-        return PlusTypedBuffer(left_buf,right_buf)
+        make_left = typed_buffer_factory(stream_type.left_type)
+        make_right = typed_buffer_factory(stream_type.right_type)
+        return lambda: PlusTypedBuffer(make_left(), make_right())
     elif isinstance(stream_type, TyEps):
-        return EpsTypedBuffer()
+        return EpsTypedBuffer
     else:
         raise ValueError(f"Cannot create TypedBuffer for type: {stream_type}")
+
+
+def make_typed_buffer(stream_type):
+    """Factory function to create the appropriate TypedBuffer subclass for a stream type."""
+    return typed_buffer_factory(stream_type)()
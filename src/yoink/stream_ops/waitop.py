@@ -6,7 +6,7 @@ import ast
 from yoink.compilation.runtime import Runtime
 from yoink.stream_ops.base import StreamOp, DONE
 from yoink.compilation import StateVar
-from yoink.stream_ops.typed_buffer import TypedBuffer, make_typed_buffer
+from yoink.stream_ops.typed_buffer import TypedBuffer, typed_buffer_factory
 
 
 class WaitOp(StreamOp):
@@ -14,7 +14,8 @@ class WaitOp(StreamOp):
     def __init__(self, input_stream):
         super().__init__(input_stream.stream_type)
         self.input_stream = input_stream
-        self.buffer = make_typed_buffer(input_stream.stream_type)
+        self.make_buffer = typed_buffer_factory(input_stream.stream_type)
+        self.buffer = self.make_buffer()
 
     @property
     def id(self):
@@ -38,7 +39,7 @@ class WaitOp(StreamOp):
             return None
 
     def reset(self):
-        self.buffer = make_typed_buffer(self.input_stream.stream_type)
+        self.buffer = self.make_buffer()
 
     def ensure_legal_recursion(self,is_in_tail : bool):
         self.input_stream.ensure_legal_recursion(is_in_tail=False)
\ No newline at end of file
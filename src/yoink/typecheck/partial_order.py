@@ -1,43 +1,64 @@
+from collections import defaultdict
+
+
 class PartialOrder:
     def __init__(self, metadata=None):
-        self.edges = set()  # Set of (x, y) where x <= y (maintains transitive closure, non-reflexive)
+        # Edges (x, y) where x <= y, kept as adjacency sets in both directions
+        # (maintains transitive closure, non-reflexive)
+        self._succ = defaultdict(set)  # x -> {y | x <= y}
+        self._pred = defaultdict(set)  # y -> {x | x <= y}
         self.metadata = metadata if metadata is not None else {}  # Shared metadata dict
 
-    def _ensure_transitive_closure(self):
-        changed = True
-        while changed:
-            changed = False
-            new_edges = set()
-            for (a, b) in self.edges:
-                for (c, d) in self.edges:
-                    if b == c and (a, d) not in self.edges:
-                        new_edges.add((a, d))
-                        changed = True
-            self.edges.update(new_edges)
+    def edge_set(self):
+        """Build the set of all (x, y) edges from the adjacency sets. O(E); not for hot paths."""
+        return {(x, y) for x, ys in self._succ.items() for y in ys}
+
+    def _add_closed(self, xs, ys):
+        """Add edges from everything at or below xs to everything at or above ys.
+
+        Edges are never removed, so if the order was transitively closed before,
+        it is closed again after adding this product.
+        """
+        ps = set(xs)
+        for x in xs:
+            ps.update(self._pred.get(x, ()))
+        qs = set(ys)
+        for y in ys:
+            qs.update(self._succ.get(y, ()))
+        for p in ps:
+            succ_p = self._succ[p]
+            for q in qs:
+                if q not in succ_p:
+                    succ_p.add(q)
+                    self._pred[q].add(p)
 
     def add_edge(self, x, y):
         if x == y:
             return
 
-        self.edges.add((x, y))
-        self._ensure_transitive_closure()
+        self._add_closed((x,), (y,))
 
     def add_all_edges(self, set1, set2):
+        if set1.isdisjoint(set2):
+            self._add_closed(set1, set2)
+            return
+        # Shared elements would gain a self-edge from the product, so add pairwise
         for x in set1:
             for y in set2:
                 self.add_edge(x, y)
 
     def has_edge(self, x, y):
-        return (x, y) in self.edges
+        return y in self._succ.get(x, ())
 
     def predecessors(self, x):
-        return {y for (y, z) in self.edges if z == x and y != x}
+        return self._pred.get(x, set()) - {x}
 
     def successors(self, x):
-        return {z for (y, z) in self.edges if y == x and z != x}
+        return self._succ.get(x, set()) - {x}
 
     def overlaps_with(self, other):
-        return bool(self.edges.intersection(other.edges))
+        small, large = (self, other) if len(self._succ) <= len(other._succ) else (other, self)
+        return any(not ys.isdisjoint(large._succ.get(x, ())) for x, ys in small._succ.items())
 
     def _format_node(self, node):
         """Format a node with metadata if available."""
@@ -46,7 +67,8 @@ class PartialOrder:
         return str(node)
 
     def __str__(self):
-        if not self.edges:
+        edges = self.edge_set()
+        if not edges:
             return "PartialOrder({})"
-        edges_str = ", ".join(f"{self._format_node(x)} < {self._format_node(y)}" for x, y in self.edges)
+        edges_str = ", ".join(f"{self._format_node(x)} < {self._format_node(y)}" for x, y in edges)
         return f"PartialOrder({edges_str})"
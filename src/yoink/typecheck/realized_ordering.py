@@ -17,7 +17,7 @@ class RealizedOrdering:
     def check_consistency(self):
         """Check if any required edge conflicts with forbidden edges."""
         if self.required.overlaps_with(self.forbidden):
-            conflicting = self.required.edges.intersection(self.forbidden.edges)
+            conflicting = self.required.edge_set() & self.forbidden.edge_set()
             print(self.required)
             print(self.forbidden)
             raise ValueError(f"Inconsistent constraints: edges both required and forbidden: {conflicting}")
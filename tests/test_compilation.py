@@ -1,5 +1,6 @@
 """Tests for compiled StreamOp execution - verify interpreter and compiler agree."""
 
+import itertools
 import pytest
 from hypothesis import given, settings
 from yoink.core import Yoink, Singleton, TyStar, TyCat, TyPlus, PlusPuncA, PlusPuncB, CatEvA, CatPunc, BaseEvent
@@ -605,3 +606,166 @@ def test_compile_runs_of_nonz(input_events):
 
     run_all(f, input_events, compilers=[DirectCompiler, CPSCompiler])
 
+
+
+@pytest.mark.parametrize("b", [True, False])
+def test_compile_cond_identical_branches(b):
+    """Test cond whose branches compile to the same code."""
+    @Yoink.jit
+    def f(yoink, c: Singleton(bool)):
+        return yoink.cond(c, yoink.singleton(1), yoink.singleton(1))
+
+    run_all(f, [BaseEvent(b)], compilers=[DirectCompiler, CPSCompiler])
+
+
+def _raw_outputs(program, *inputs):
+    """Unfiltered outputs of the interpreter, DirectCompiler and CPSCompiler, None included."""
+    outputs = [list(program(*[iter(inp) for inp in inputs]))]
+    for compiler in [DirectCompiler, CPSCompiler]:
+        outputs.append(list(program.compile(compiler)(*[iter(inp) for inp in inputs])))
+    return outputs
+
+
+def test_silent_ticks_match_interpreter():
+    """A None read from an input is a silent tick in every backend, not something to skip over."""
+    @Yoink.jit
+    def passthrough(yoink, x: INT_TY):
+        return x
+
+    @Yoink.jit
+    def cat(yoink, x: STRING_TY, y: STRING_TY):
+        return yoink.catr(x, y)
+
+    @Yoink.jit
+    def cond(yoink, c: Singleton(bool), l: STRING_TY, r: STRING_TY):
+        return yoink.cond(c, l, r)
+
+    @Yoink.jit
+    def case(yoink, x: TyPlus(STRING_TY, STRING_TY)):
+        return yoink.case(x, lambda a: a, lambda b: b)
+
+    cases = [
+        (passthrough, [None, None, BaseEvent(1)]),
+        (cat, [None, BaseEvent("a")], [None, BaseEvent("b")]),
+        (cond, [None, BaseEvent(False)], [BaseEvent("l")], [None, BaseEvent("r")]),
+        (case, [None, PlusPuncB(), None, BaseEvent("b")]),
+    ]
+    for program, *inputs in cases:
+        interp, *compiled = _raw_outputs(program, *inputs)
+        assert None in interp
+        assert all(result == interp for result in compiled)
+
+
+def test_direct_compiler_head_skip_yields_on_none():
+    """Skipping a CatProj head stops at a None from the input instead of reading on past it."""
+    @Yoink.jit
+    def snd(yoink, z: TyCat(STRING_TY, STRING_TY)):
+        a, b = yoink.catl(z)
+        return b
+
+    CompiledClass = snd.compile(DirectCompiler)
+    output = CompiledClass(iter([CatEvA(BaseEvent("a")), None, CatPunc(), BaseEvent("b")]))
+    assert list(output) == [None, BaseEvent("b")]
+
+    # A source with no event ready yet gets control handed back rather than polled forever
+    output = CompiledClass(itertools.repeat(None))
+    assert next(output) is None
+
+
+@pytest.mark.parametrize("compiler", [DirectCompiler, CPSCompiler, GeneratorCompiler])
+def test_get_code(compiler):
+    """get_code renders the generated module as source."""
+    @Yoink.jit
+    def f(yoink, x: INT_TY, y: INT_TY):
+        return yoink.catr(x, y)
+
+    code = compiler.get_code(f)
+    assert code.startswith('class FlattenedIterator')
+    compile(code, '<test>', 'exec')
+
+
+def test_event_buffer_size():
+    """Buffer sizes are plain ints, with shared subtypes and linked TypeVars followed."""
+    from yoink.compilation.event_buffer_size import EventBufferSize
+    from yoink.typecheck.types import TypeVar, TyEps
+
+    pair = TyCat(INT_TY, STRING_TY)
+    var = TypeVar()
+    var.link = pair
+    ty = TyPlus(TyCat(pair, var), TyEps())
+    assert EventBufferSize(None).visit(ty) == 4
+
+
+def test_direct_compiler_slots():
+    """Instances of the direct-compiled class keep their state in slots, not a __dict__."""
+    @Yoink.jit
+    def f(yoink, s: TyStar(INT_TY)):
+        return yoink.runsOfNonZ(s)
+
+    it = f.compile(DirectCompiler)([])
+    assert not hasattr(it, '__dict__')
+
+
+def test_generator_compiler_slots():
+    """The generator-compiled class has no __dict__: inputs are a slot and the state flags are locals."""
+    @Yoink.jit
+    def f(yoink, s: TyStar(INT_TY)):
+        return yoink.map(s, lambda x: x)
+
+    xs = [PlusPuncB(), CatEvA(BaseEvent(1)), CatPunc(), PlusPuncA()]
+    it = f.compile(GeneratorCompiler)(xs)  # A list input is wrapped in an iterator
+    assert not hasattr(it, '__dict__')
+    assert [x for x in it if x is not None] == xs
+
+
+
+def test_compile_cached():
+    """Compiling a graph again reuses the class, and its instances run independently."""
+    @Yoink.jit
+    def f(yoink, x: STRING_TY, y: STRING_TY):
+        return yoink.catr(x, y)
+
+    compilers = [DirectCompiler, CPSCompiler, GeneratorCompiler]
+    classes = [f.compile(compiler) for compiler in compilers]
+    assert [f.compile(compiler) for compiler in compilers] == classes
+
+    first = run_all(f, [BaseEvent("x")], [BaseEvent("y")], compilers=compilers)
+    second = run_all(f, [BaseEvent("x")], [BaseEvent("y")], compilers=compilers)
+    assert first == second
+
+
+def test_runtime_reuses_class_for_equal_code():
+    """Graphs that generate the same module share one compiled class."""
+    def make():
+        @Yoink.jit
+        def f(yoink, x: STRING_TY, y: STRING_TY):
+            return yoink.catr(x, y)
+        return f
+
+    f, g = make(), make()
+    compilers = [DirectCompiler, CPSCompiler, GeneratorCompiler]
+    for compiler in compilers:
+        assert f.compile(compiler) is g.compile(compiler)
+    run_all(g, [BaseEvent("x")], [BaseEvent("y")], compilers=compilers)
+
+
+@pytest.mark.parametrize("xs", [[PlusPuncA(), BaseEvent(True)], [PlusPuncB(), BaseEvent(False)]])
+def test_generator_outlines_shared_branches(xs):
+    """Cond branches reached from several yield sites of the condition become subgenerators."""
+    @Yoink.jit
+    def f(yoink, x: TyPlus(Singleton(bool), Singleton(bool)), l: STRING_TY, r: STRING_TY):
+        return yoink.cond(yoink.case(x, lambda a: a, lambda b: b), l, r)
+
+    assert 'yield from' in GeneratorCompiler.get_code(f)
+    run_all(f, xs, [BaseEvent("l")], [BaseEvent("r")], compilers=[DirectCompiler, CPSCompiler, GeneratorCompiler])
+
+
+@pytest.mark.parametrize("compiler", [DirectCompiler, CPSCompiler])
+def test_case_rejects_non_event_tag(compiler):
+    """A CaseOp tag that is not an event at all gets the same RuntimeError as a wrong event."""
+    @Yoink.jit
+    def f(yoink, x: TyPlus(STRING_TY, STRING_TY)):
+        return yoink.case(x, lambda a: a, lambda b: b)
+
+    with pytest.raises(RuntimeError, match="Expected PlusPuncA or PlusPuncB tag"):
+        list(f.compile(compiler)(iter([5, BaseEvent("b")])))
@@ -68,6 +68,19 @@ def test_jit_composition():
     assert result[1] == CatPunc()
     assert result[2] == "world"
 
+
+def test_jit_run_resets_between_calls():
+    @Yoink.jit
+    def simple_cat(yoink, x: STRING_TY, y: STRING_TY):
+        return yoink.catr(x, y)
+
+    for (x, y) in [("a", "b"), ("c", "d")]:
+        result = [e for e in list(simple_cat(iter([x]), iter([y]))) if e is not None]
+        assert result == [CatEvA(x), CatPunc(), y]
+
+    with pytest.raises(ValueError):
+        simple_cat(iter(["a"]))
+
 # def test_jit_wait():
 #     @Yoink.jit
 #     def wait(yoink, x: STRING_TY):
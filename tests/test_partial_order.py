@@ -0,0 +1,68 @@
+"""Tests for PartialOrder - the maintained closure matches a brute-force transitive closure."""
+
+from hypothesis import given, settings, strategies as st
+from yoink.typecheck.partial_order import PartialOrder
+
+
+NODES = range(6)
+
+
+def brute_force_closure(pairs):
+    """Transitive closure of the pairs, dropping reflexive pairs as add_edge does."""
+    edges = {(x, y) for (x, y) in pairs if x != y}
+    changed = True
+    while changed:
+        new_edges = {(a, d) for (a, b) in edges for (c, d) in edges if b == c} - edges
+        edges |= new_edges
+        changed = bool(new_edges)
+    return edges
+
+
+def assert_matches(order, pairs):
+    expected = brute_force_closure(pairs)
+    assert order.edge_set() == expected
+    for x in NODES:
+        assert order.successors(x) == {y for (z, y) in expected if z == x and y != x}
+        assert order.predecessors(x) == {y for (y, z) in expected if z == x and y != x}
+        for y in NODES:
+            assert order.has_edge(x, y) == ((x, y) in expected)
+
+
+def test_partial_order_cycle():
+    """Closing a cycle relates every node on it to every other, and to itself."""
+    order = PartialOrder()
+    pairs = [(0, 1), (1, 2), (2, 0)]
+    for (x, y) in pairs:
+        order.add_edge(x, y)
+
+    assert_matches(order, pairs)
+    assert order.has_edge(0, 0)
+    assert order.successors(0) == {1, 2}
+
+
+def test_partial_order_overlapping_add_all_edges():
+    """A node in both sets of add_all_edges gets no self-edge from the product."""
+    order = PartialOrder()
+    order.add_edge(3, 0)
+    order.add_all_edges({0, 1}, {1, 2})
+
+    assert_matches(order, [(3, 0), (0, 1), (0, 2), (1, 1), (1, 2)])
+    assert not order.has_edge(1, 1)
+
+
+@given(st.lists(st.tuples(st.sets(st.sampled_from(NODES), max_size=3), st.sets(st.sampled_from(NODES), max_size=3)), max_size=8))
+@settings(max_examples=100)
+def test_partial_order_matches_brute_force(steps):
+    order = PartialOrder()
+    pairs = []
+    for (set1, set2) in steps:
+        if len(set1) == 1 and len(set2) == 1:
+            order.add_edge(next(iter(set1)), next(iter(set2)))
+        else:
+            order.add_all_edges(set1, set2)
+        pairs.extend((x, y) for x in set1 for y in set2)
+        assert_matches(order, pairs)
+
+    other = PartialOrder()
+    other.add_edge(0, 1)
+    assert order.overlaps_with(other) == ((0, 1) in order.edge_set())